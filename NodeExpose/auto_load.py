@@ -1,7 +1,8 @@
 import os
 import bpy
-import sys
+import json
 import typing
+import hashlib
 import inspect
 import pkgutil
 import importlib
@@ -18,15 +19,32 @@ blender_version = bpy.app.version
 modules = None
 ordered_classes = None
 
+MANIFEST_NAME = ".auto_load_manifest.json"
+MANIFEST_VERSION = 1
+
+class RegistrationCycleError(Exception):
+    pass
+
 def init():
     global modules
     global ordered_classes
 
-    modules = get_all_submodules(Path(__file__).parent)
+    directory = Path(__file__).parent
+    files = get_source_files(directory)
+    manifest_path = directory / MANIFEST_NAME
+    cached = load_manifest(manifest_path, directory, files)
+    if cached is not None:
+        modules, ordered_classes = cached
+        return
+
+    modules = get_all_submodules(directory)
     ordered_classes = get_ordered_classes_to_register(modules)
+    save_manifest(manifest_path, directory, files, modules, ordered_classes)
 
 def register():
     for cls in ordered_classes:
+        if bpy.app.background and is_ui_class(cls):
+            continue
         bpy.utils.register_class(cls)
 
     for module in modules:
@@ -37,7 +55,8 @@ def register():
 
 def unregister():
     for cls in reversed(ordered_classes):
-        bpy.utils.unregister_class(cls)
+        if getattr(cls, "is_registered", False):
+            bpy.utils.unregister_class(cls)
 
     for module in modules:
         if module.__name__ == __name__:
@@ -66,6 +85,79 @@ def iter_submodule_names(path, root=""):
             yield root + module_name
 
 
+# Cache module list and class order
+#################################################
+
+# The manifest stores the module names and class order computed on the last
+# start along with the modification time, size and hash of every source file.
+# If the files haven't changed the modules are imported from the stored list
+# and classes looked up by name, skipping class reflection and sorting. Files
+# with a new mtime but the same hash, e.g. after a fresh checkout, still match,
+# and the manifest is rewritten with the new mtimes so they aren't hashed again.
+
+def get_source_files(directory):
+    files = {}
+    for path in sorted(directory.rglob("*.py")):
+        stat = path.stat()
+        files[path.relative_to(directory).as_posix()] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+def hash_file(path):
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+def load_manifest(manifest_path, directory, files):
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    if tuple(manifest.get("blender", ())) != tuple(blender_version):
+        return None
+    stored = manifest.get("files", {})
+    if stored.keys() != files.keys():
+        return None
+    touched = False
+    for name, (mtime, size) in files.items():
+        stored_mtime, stored_size, stored_hash = stored[name]
+        if size != stored_size:
+            return None
+        if mtime != stored_mtime:
+            if hash_file(directory / name) != stored_hash:
+                return None
+            touched = True
+
+    package_name = directory.name
+    loaded_modules = [importlib.import_module("." + name, package_name)
+                      for name in manifest["modules"]]
+    modules_by_name = {module.__name__: module for module in loaded_modules}
+    classes = []
+    for module_name, class_name in manifest["classes"]:
+        cls = getattr(modules_by_name.get(module_name), class_name, None)
+        if cls is None:
+            return None
+        classes.append(cls)
+    if touched:
+        save_manifest(manifest_path, directory, files, loaded_modules, classes)
+    return loaded_modules, classes
+
+def save_manifest(manifest_path, directory, files, modules, classes):
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "blender": list(blender_version),
+        "files": {name: [mtime, size, hash_file(directory / name)]
+                  for name, (mtime, size) in files.items()},
+        "modules": [module.__name__.split(".", 1)[1] for module in modules],
+        "classes": [[cls.__module__, cls.__name__] for cls in classes],
+    }
+    try:
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f)
+    except OSError:
+        pass
+
+
 # Find classes to register
 #################################################
 
@@ -129,6 +221,12 @@ def iter_classes_in_module(module):
         if inspect.isclass(value):
             yield value
 
+def is_ui_class(cls):
+    # UI classes aren't registered in background mode as nothing draws them
+    ui_types = (bpy.types.Panel, bpy.types.UIList, bpy.types.Menu,
+                bpy.types.Header, bpy.types.Gizmo, bpy.types.GizmoGroup)
+    return issubclass(cls, ui_types)
+
 def get_register_base_types():
     return set(getattr(bpy.types, name) for name in [
         "Panel", "Operator", "PropertyGroup",
@@ -153,5 +251,9 @@ def toposort(deps_dict):
                 sorted_values.add(value)
             else:
                 unsorted.append(value)
+        if len(unsorted) == len(deps_dict):
+            names = sorted(getattr(value, "__name__", str(value)) for value in unsorted)
+            raise RegistrationCycleError(
+                "Cyclic registration dependencies between: " + ", ".join(names))
         deps_dict = {value : deps_dict[value] - sorted_values for value in unsorted}
     return sorted_list
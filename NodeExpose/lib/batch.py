@@ -0,0 +1,280 @@
+"""Copy exposed values between node trees by frame / node / socket path.
+
+Paths are tuples of the names of the frames from the top level frame down to
+the node, followed by the node name and the socket identifier, so matching
+nodes are found in other trees built from the same layout even if they are
+not in the same order.
+"""
+from time import monotonic
+from .hierarchy import get_hierarchy
+
+# tree type -> ((tree pointer, top level frame), values) of the batch edit source
+_snapshots = {}
+# tree type -> (values, target trees, time queued) waiting to be copied
+_pending = {}
+# (tree pointer, top level frame) -> (hierarchy version, [(path, socket)])
+_exposed_paths = {}
+
+
+def get_path(node, socket):
+    """Return path of socket relative to the node tree's top level frames.
+
+    Args:
+        node (bpy.types.Node): node
+        socket (bpy.types.NodeSocket): socket of node
+
+    Returns:
+        tuple[str]: frame names, node name, socket side and identifier
+    """
+    frames = []
+    parent = node.parent
+    while parent is not None:
+        frames.append(parent.name)
+        parent = parent.parent
+    side = 'OUTPUT' if socket.is_output else 'INPUT'
+    return tuple(reversed(frames)) + (node.name, side, socket.identifier)
+
+
+def iter_exposed_sockets(tree, top_level_frame):
+    """Yield sockets drawn for the nodes below a top level frame.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+        top_level_frame (str): name of top level frame
+
+    Yields:
+        tuple[bpy.types.Node, bpy.types.NodeSocket]: node and socket
+    """
+    for node in get_hierarchy(tree).descendants(top_level_frame):
+        if node.type == 'VALUE':
+            yield node, node.outputs[0]
+            continue
+        for socket in node.inputs:
+            if hasattr(socket, 'default_value'):
+                yield node, socket
+
+
+def get_exposed_paths(tree, top_level_frame):
+    """Return path and socket of every socket below a top level frame.
+
+    Cached until the tree's hierarchy changes, so rereading the values
+    during a slider drag doesn't walk the frames of every socket again.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+        top_level_frame (str): name of top level frame
+
+    Returns:
+        list[tuple[tuple, bpy.types.NodeSocket]]: path and socket
+    """
+    version = get_hierarchy(tree).version
+    key = (tree.as_pointer(), top_level_frame)
+    cached = _exposed_paths.get(key)
+    if cached is None or cached[0] != version:
+        paths = [(get_path(node, socket), socket)
+                 for node, socket in iter_exposed_sockets(tree, top_level_frame)]
+        cached = (version, paths)
+        _exposed_paths[key] = cached
+    return cached[1]
+
+
+def read_values(tree, top_level_frame):
+    """Return current values of the sockets below a top level frame.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+        top_level_frame (str): name of top level frame
+
+    Returns:
+        dict[tuple, any]: path -> value, arrays as tuples
+    """
+    values = {}
+    for path, socket in get_exposed_paths(tree, top_level_frame):
+        value = socket.default_value
+        if hasattr(value, '__len__') and not isinstance(value, str):
+            value = tuple(value)
+        values[path] = value
+    return values
+
+
+def write_values(tree, values):
+    """Write values to the matching sockets of tree.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+        values (dict[tuple, any]): path -> value
+
+    Returns:
+        int: number of sockets written
+    """
+    nodes = tree.nodes
+    written = 0
+    for path, value in values.items():
+        node = nodes.get(path[-3])
+        if node is None:
+            continue
+        sockets = node.outputs if path[-2] == 'OUTPUT' else node.inputs
+        socket = next((s for s in sockets if s.identifier == path[-1]), None)
+        if socket is None or get_path(node, socket) != path:
+            continue
+        try:
+            socket.default_value = value
+            written += 1
+        except (TypeError, ValueError):
+            pass
+    return written
+
+
+def take_snapshot(tree_type, tree, top_level_frame):
+    """Record current values of tree so later edits can be detected.
+
+    Called when batch editing is turned on and whenever the source tree or
+    top level frame changes, so the first edit made afterwards is detected.
+
+    Args:
+        tree_type (str): 'MATERIAL' or 'GEOMETRY'
+        tree (bpy.types.NodeTree): node tree
+        top_level_frame (str): name of top level frame
+    """
+    key = (tree.as_pointer(), top_level_frame)
+    _snapshots[tree_type] = (key, read_values(tree, top_level_frame))
+
+
+def has_snapshot(tree_type, tree, top_level_frame):
+    """Return True if the snapshot for tree_type was taken of tree and top_level_frame.
+
+    Args:
+        tree_type (str): 'MATERIAL' or 'GEOMETRY'
+        tree (bpy.types.NodeTree): node tree
+        top_level_frame (str): name of top level frame
+
+    Returns:
+        bool: True if snapshot is of this source
+    """
+    snapshot = _snapshots.get(tree_type)
+    return snapshot is not None and snapshot[0] == (tree.as_pointer(), top_level_frame)
+
+
+def detect_changes(tree_type, tree, top_level_frame):
+    """Return values changed since the snapshot for tree_type and update the snapshot.
+
+    Args:
+        tree_type (str): 'MATERIAL' or 'GEOMETRY'
+        tree (bpy.types.NodeTree): node tree the snapshot was taken of
+        top_level_frame (str): name of top level frame
+
+    Returns:
+        dict[tuple, any]: path -> new value
+    """
+    key, snapshot = _snapshots[tree_type]
+    values = read_values(tree, top_level_frame)
+    _snapshots[tree_type] = (key, values)
+    return {p: v for p, v in values.items() if snapshot.get(p) != v}
+
+
+def get_source(context, tree_type):
+    """Return the active object's node tree and top level frame for tree_type.
+
+    Args:
+        context (bpy.types.Context): context
+        tree_type (str): 'MATERIAL' or 'GEOMETRY'
+
+    Returns:
+        tuple[bpy.types.NodeTree, str]: node tree and top level frame name
+
+    Raises:
+        AttributeError, KeyError: active object has no such tree
+    """
+    scene_props = context.scene.ne_scene_props
+    obj = context.object
+    if tree_type == 'MATERIAL':
+        return obj.active_material.node_tree, scene_props.mat_top_level_frame
+    mod = obj.modifiers[scene_props.geom_node_mod]
+    return mod.node_group, scene_props.geom_top_level_frame
+
+
+def get_targets(objects, source, tree_type, top_level_frame, source_object=None):
+    """Return node trees of objects that values should be copied to.
+
+    Only trees with an exposed frame named top_level_frame are returned, so
+    values are only copied between trees built from the same layout. The
+    source object is skipped so its other geometry nodes modifiers are left
+    alone.
+
+    Args:
+        objects (list[bpy.types.Object]): objects, usually the selection
+        source (bpy.types.NodeTree): tree values are copied from
+        tree_type (str): 'MATERIAL' or 'GEOMETRY'
+        top_level_frame (str): name of top level frame values are copied from
+        source_object (bpy.types.Object, optional): object owning source
+
+    Returns:
+        list[bpy.types.NodeTree]: node trees, each listed once
+    """
+    trees = {}
+    for obj in objects:
+        if obj == source_object:
+            continue
+        if tree_type == 'MATERIAL':
+            mat = obj.active_material
+            candidates = (mat.node_tree,) if mat else ()
+        else:
+            candidates = (m.node_group for m in obj.modifiers if m.type == 'NODES')
+        for tree in candidates:
+            if tree is not None and tree != source \
+                    and top_level_frame in get_hierarchy(tree).exposed_names:
+                trees[tree.as_pointer()] = tree
+    return list(trees.values())
+
+
+def add_pending(tree_type, changes, targets):
+    """Queue values to be copied to the node trees of selected objects.
+
+    Args:
+        tree_type (str): 'MATERIAL' or 'GEOMETRY'
+        changes (dict[tuple, any]): path -> value
+        targets (list[bpy.types.NodeTree]): trees to copy to
+    """
+    values = _pending.get(tree_type, ({}, None, None))[0]
+    values.update(changes)
+    _pending[tree_type] = (values, targets, monotonic())
+
+
+def seconds_since_queued(tree_type):
+    """Return time since values were last queued for tree_type.
+
+    Args:
+        tree_type (str): 'MATERIAL' or 'GEOMETRY'
+
+    Returns:
+        float | None: seconds, None if nothing is queued
+    """
+    pending = _pending.get(tree_type)
+    return None if pending is None else monotonic() - pending[2]
+
+
+def apply_pending(tree_type):
+    """Write and clear values queued for tree_type.
+
+    Args:
+        tree_type (str): 'MATERIAL' or 'GEOMETRY'
+
+    Returns:
+        int: number of sockets written
+    """
+    values, targets, _ = _pending.pop(tree_type, ({}, (), None))
+    written = 0
+    for tree in targets:
+        try:
+            written += write_values(tree, values)
+        except ReferenceError:
+            # tree was removed after the edit was queued
+            pass
+    return written
+
+
+def reset_batch():
+    """Forget snapshots, pending values and cached paths, e.g. after undo or file load."""
+    _snapshots.clear()
+    _pending.clear()
+    _exposed_paths.clear()
@@ -0,0 +1,111 @@
+"""Set exposed values from the command line, e.g. on a render farm.
+
+Values are addressed by the same frame / node / socket paths used for batch
+editing, written with slashes, e.g. ``Top/Wear/Mix/INPUT/Fac``. The socket
+can be given by identifier or by name.
+"""
+import bpy
+from .batch import get_path, iter_exposed_sockets
+from .hierarchy import get_hierarchy
+
+OWNER_TYPES = ('material', 'node_group', 'scene', 'texture')
+
+
+def get_tree(owner_type, name):
+    """Return node tree of a material, node group, scene's compositor or texture.
+
+    Args:
+        owner_type (str): one of OWNER_TYPES
+        name (str): name of the datablock
+
+    Returns:
+        bpy.types.NodeTree: node tree
+
+    Raises:
+        KeyError: there is no such datablock or it has no node tree
+    """
+    if owner_type == 'node_group':
+        return bpy.data.node_groups[name]
+    owner = {
+        'material': bpy.data.materials,
+        'scene': bpy.data.scenes,
+        'texture': bpy.data.textures}[owner_type][name]
+    if owner.node_tree is None:
+        raise KeyError("%s has no node tree" % name)
+    return owner.node_tree
+
+
+def get_exposed_sockets(tree):
+    """Return every exposed socket of tree by path.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+
+    Returns:
+        dict[str, bpy.types.NodeSocket]: path -> socket, keyed both by socket
+            identifier and socket name
+    """
+    sockets = {}
+    for frame in get_hierarchy(tree).root_exposed_frames():
+        for node, socket in iter_exposed_sockets(tree, frame.name):
+            path = get_path(node, socket)
+            sockets['/'.join(path)] = socket
+            sockets.setdefault('/'.join(path[:-1] + (socket.name,)), socket)
+    return sockets
+
+
+def parse_value(text, current):
+    """Convert text to the type of a socket's current value.
+
+    Args:
+        text (str): value, comma separated for vectors and colours
+        current (any): socket's current default_value
+
+    Returns:
+        any: value
+
+    Raises:
+        ValueError: text can't be converted
+    """
+    if isinstance(current, bool):
+        if text.lower() not in {'true', 'false', '1', '0'}:
+            raise ValueError("Expected true or false, got " + text)
+        return text.lower() in {'true', '1'}
+    if isinstance(current, int):
+        return int(text)
+    if isinstance(current, float):
+        return float(text)
+    if hasattr(current, '__len__') and not isinstance(current, str):
+        values = [float(v) for v in text.split(',')]
+        if len(values) != len(current):
+            raise ValueError("Expected %d values, got %s" % (len(current), text))
+        return values
+    return text
+
+
+def set_values(tree, assignments):
+    """Set exposed values of tree.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+        assignments (list[str]): 'path=value' strings
+
+    Returns:
+        list[str]: errors, one per assignment that couldn't be made
+    """
+    sockets = get_exposed_sockets(tree)
+    errors = []
+    for assignment in assignments:
+        path, sep, text = assignment.partition('=')
+        if not sep:
+            errors.append("Expected path=value, got " + assignment)
+            continue
+        socket = sockets.get(path.strip().strip('/'))
+        if socket is None:
+            errors.append("No exposed socket " + path)
+            continue
+        try:
+            socket.default_value = parse_value(text.strip(), socket.default_value)
+        except (TypeError, ValueError) as err:
+            errors.append("%s: %s" % (path, err))
+    return errors
@@ -0,0 +1,45 @@
+"""Cache for dynamic EnumProperty items.
+
+Blender calls the items callback of a dynamic enum every time the property is
+drawn or read. Items are cached by key together with a version, and the same
+list is returned until the version changes. Holding on to the list also keeps
+the strings alive, which Blender requires of dynamic enum items.
+"""
+
+_enum_cache = {}
+
+
+def get_enum_items(key, version):
+    """Return cached enum items for key if they were built for version.
+
+    Args:
+        key (hashable): cache key, e.g. kind of enum and tree pointer
+        version (hashable): version the items must have been built for
+
+    Returns:
+        list(enum_items) | None: enum items or None if not cached
+    """
+    entry = _enum_cache.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    return None
+
+
+def set_enum_items(key, version, enum_items):
+    """Cache enum items for key and version.
+
+    Args:
+        key (hashable): cache key
+        version (hashable): version the items were built for
+        enum_items (list(enum_items)): enum items
+
+    Returns:
+        list(enum_items): enum_items
+    """
+    _enum_cache[key] = (version, enum_items)
+    return enum_items
+
+
+def clear_enum_cache():
+    """Drop all cached enum items."""
+    _enum_cache.clear()
@@ -0,0 +1,100 @@
+"""Records of every exposed socket in the open file, for export as JSON lines.
+
+Node trees are gathered as for the parameter list and walked like the panels
+draw them, so excluded nodes and reroutes are left out and the exposed frames
+of node groups are followed into the group's tree.
+"""
+import math
+from .batch import get_path, iter_exposed_sockets
+from .hierarchy import get_hierarchy
+from .param_index import iter_trees
+from .utils import get_node_label
+
+
+def to_json_value(value):
+    """Return socket value as something json can write.
+
+    NaN and infinity aren't valid JSON, so they are written as null.
+
+    Args:
+        value (any): socket default_value
+
+    Returns:
+        any: value, arrays as lists and datablocks as their names
+    """
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if hasattr(value, '__len__'):
+        return [to_json_value(v) for v in value]
+    return getattr(value, 'name', str(value))
+
+
+def get_node_path(node):
+    """Return names of the frames containing node followed by its own name.
+
+    Args:
+        node (bpy.types.Node): node
+
+    Returns:
+        tuple[str]: frame names and node name
+    """
+    path = [node.name]
+    parent = node.parent
+    while parent is not None:
+        path.append(parent.name)
+        parent = parent.parent
+    return tuple(reversed(path))
+
+
+def iter_sockets(tree, top_level_frame, prefix=(), groups=frozenset()):
+    """Yield every socket the panels show below a top level frame.
+
+    Group nodes are followed into the root exposed frames of their node
+    tree, as display_node does.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+        top_level_frame (str): name of top level frame
+        prefix (tuple[str]): path of the group node tree is displayed in
+        groups (frozenset[int]): pointers of the node groups being walked
+
+    Yields:
+        tuple[bpy.types.Node, bpy.types.NodeSocket, tuple[str]]: node, socket and path
+    """
+    for node, socket in iter_exposed_sockets(tree, top_level_frame):
+        yield node, socket, prefix + get_path(node, socket)
+    for node in get_hierarchy(tree).descendants(top_level_frame):
+        group = node.node_tree if node.type == 'GROUP' else None
+        if group is None or group.as_pointer() in groups:
+            continue
+        group_prefix = prefix + get_node_path(node)
+        for frame in get_hierarchy(group).root_exposed_frames():
+            yield from iter_sockets(
+                group, frame.name, group_prefix, groups | {group.as_pointer()})
+
+
+def iter_records(filepath):
+    """Yield a record for every exposed socket of the open file.
+
+    Args:
+        filepath (str): path of the open file, written into each record
+
+    Yields:
+        dict: file, owner type and name, top level frame, path, node and
+            socket labels and value
+    """
+    for owner_type, owner, tree in iter_trees():
+        for frame in get_hierarchy(tree).root_exposed_frames():
+            for node, socket, path in iter_sockets(tree, frame.name):
+                yield {
+                    'file': filepath,
+                    'owner_type': owner_type,
+                    'owner': owner,
+                    'top_level_frame': get_node_label(frame),
+                    'path': '/'.join(path),
+                    'node': get_node_label(node),
+                    'socket': socket.label or socket.name,
+                    'value': to_json_value(socket.default_value),
+                }
@@ -0,0 +1,138 @@
+"""Owner of all of the addon's app handlers and timers.
+
+Handlers and timers are added under a key, by default the module and name of
+the function. Adding a key that is already installed replaces the earlier
+function rather than adding a second copy. Handler wrappers carry their key,
+so copies left behind by an earlier load of the addon, e.g. after a reload
+without unregistering, are found and replaced as well.
+
+Every wrapper counts its calls and the time spent in them, which the timings
+panel reports along with the number of installed handlers and timers.
+"""
+from time import perf_counter
+import bpy
+from bpy.app.handlers import persistent
+
+# key of a wrapped handler
+KEY_ATTR = '_node_expose_key'
+
+_handlers = {}
+_timers = {}
+_timings = {}
+
+
+def get_key(func, name=None):
+    return name or '%s.%s' % (func.__module__, func.__qualname__)
+
+
+def _wrap(key, func, timing_key):
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings = _timings.setdefault(timing_key, [0, 0.0])
+            timings[0] += 1
+            timings[1] += perf_counter() - start
+    wrapper.__name__ = getattr(func, '__name__', key)
+    wrapper.__doc__ = func.__doc__
+    wrapper.__wrapped__ = func
+    setattr(wrapper, KEY_ATTR, key)
+    return wrapper
+
+
+def add_handler(event, func, name=None):
+    """Install func as an app handler, replacing any handler with the same key.
+
+    Args:
+        event (str): name of list in bpy.app.handlers, e.g. 'depsgraph_update_post'
+        func (function): handler, persistent if decorated with @persistent
+        name (str, optional): key, defaults to the function's module and name
+    """
+    key = get_key(func, name)
+    remove_handler(event, key)
+    wrapper = _wrap(key, func, (event, key))
+    if hasattr(func, '_bpy_persistent'):
+        wrapper = persistent(wrapper)
+    getattr(bpy.app.handlers, event).append(wrapper)
+    _handlers[event, key] = wrapper
+
+
+def remove_handler(event, key):
+    """Remove every installed copy of a handler.
+
+    Args:
+        event (str): name of list in bpy.app.handlers
+        key (str): key the handler was added under
+    """
+    handlers = getattr(bpy.app.handlers, event)
+    for handler in [h for h in handlers if getattr(h, KEY_ATTR, None) == key]:
+        handlers.remove(handler)
+    _handlers.pop((event, key), None)
+
+
+def add_timer(func, first_interval=0, persistent=False, name=None):
+    """Register func as a timer unless a timer with the same key is still pending.
+
+    Args:
+        func (function): timer function
+        first_interval (float): seconds until first call
+        persistent (bool): keep timer when a file is loaded
+        name (str, optional): key, defaults to the function's module and name
+    """
+    key = get_key(func, name)
+    wrapper = _timers.get(key)
+    if wrapper is not None and bpy.app.timers.is_registered(wrapper):
+        return
+    wrapper = _wrap(key, func, ('timer', key))
+    bpy.app.timers.register(wrapper, first_interval=first_interval, persistent=persistent)
+    _timers[key] = wrapper
+
+
+def has_timer(name):
+    """Return True if a timer is pending under key name.
+
+    Args:
+        name (str): key
+
+    Returns:
+        bool: timer is registered
+    """
+    wrapper = _timers.get(name)
+    return wrapper is not None and bpy.app.timers.is_registered(wrapper)
+
+
+def remove_timer(name):
+    wrapper = _timers.pop(name, None)
+    if wrapper is not None and bpy.app.timers.is_registered(wrapper):
+        bpy.app.timers.unregister(wrapper)
+
+
+def remove_module(module_name):
+    """Remove all handlers and timers added with a key in module_name.
+
+    Args:
+        module_name (str): module name, usually __name__ of the caller
+    """
+    prefix = module_name + '.'
+    for event, key in [k for k in _handlers if k[1].startswith(prefix)]:
+        remove_handler(event, key)
+    for key in [k for k in _timers if k.startswith(prefix)]:
+        remove_timer(key)
+
+
+def report():
+    """Return installed handlers and timers with their call counts and time.
+
+    Returns:
+        list[tuple[str, str, int, float]]: event or 'timer', key, calls and
+            total milliseconds, handlers first
+    """
+    rows = []
+    for event, key in sorted(_handlers):
+        calls, total = _timings.get((event, key), (0, 0.0))
+        rows.append((event, key, calls, total * 1000))
+    for key in sorted(k for k in _timers if has_timer(k)):
+        calls, total = _timings.get(('timer', key), (0, 0.0))
+        rows.append(('timer', key, calls, total * 1000))
+    return rows
@@ -0,0 +1,232 @@
+"""Cached frame hierarchy for node trees.
+
+Building the parent -> children mapping for a node tree is a single pass over
+its nodes. The result is cached per node tree and reused by every panel until
+the tree is invalidated or its nodes' names or parents change.
+"""
+from itertools import count
+from .search import SearchIndex
+
+_hierarchies = {}
+
+# every hierarchy gets a new version, so caches keyed by it never match a rebuilt tree
+_versions = count(1)
+
+
+class FrameHierarchy:
+    """Parent -> children index for the nodes of a single node tree.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree to index
+    """
+
+    def __init__(self, tree):
+        nodes = tree.nodes
+        self.signature = get_signature(nodes)
+        self.version = next(_versions)
+        self.children = {}
+        self.frames = {}
+        self.parents = set()
+        self.exposed_frames = []
+
+        for node in nodes:
+            node_type = node.type
+            if node_type == 'FRAME' and node.ne_node_props.expose_frame:
+                self.exposed_frames.append(node)
+            parent = node.parent
+            if parent is None:
+                continue
+            self.parents.add(parent.name)
+            if node_type == 'FRAME':
+                self.frames.setdefault(parent.name, []).append(node)
+            elif node_type != 'REROUTE' and not node.ne_node_props.exclude_node:
+                self.children.setdefault(parent.name, []).append(node)
+
+        for nodes_list in self.children.values():
+            nodes_list.sort(key=lambda n: n.label)
+        for nodes_list in self.frames.values():
+            nodes_list.sort(key=lambda n: n.label)
+        self.exposed_frames.sort(key=lambda n: n.label)
+        self.exposed_names = {f.name for f in self.exposed_frames}
+        self._depths = {}
+        self._root_exposed_frames = None
+        self._descendants = {}
+        self._search_indices = {}
+
+    def child_nodes(self, frame):
+        """Return sorted non frame children of frame that should be displayed.
+
+        Reroutes and nodes with exclude_node set are left out.
+
+        Args:
+            frame (bpy.types.NodeFrame): frame
+
+        Returns:
+            list[bpy.types.Node]: child nodes
+        """
+        return self.children.get(frame.name, [])
+
+    def child_frames(self, frame):
+        """Return sorted frame children of frame.
+
+        Args:
+            frame (bpy.types.NodeFrame): frame
+
+        Returns:
+            list[bpy.types.NodeFrame]: child frames
+        """
+        return self.frames.get(frame.name, [])
+
+    def has_children(self, frame):
+        """Return True if frame contains any nodes or frames.
+
+        Args:
+            frame (bpy.types.NodeFrame): frame
+
+        Returns:
+            bool: True if frame is not empty
+        """
+        return frame.name in self.parents
+
+    def depths(self, top_level_frame, offset=0):
+        """Return depth of every node below top_level_frame.
+
+        Direct children of top_level_frame have a depth of offset. The map is
+        computed in one pass the first time it is requested for a frame.
+
+        Args:
+            top_level_frame (str): name of top level frame
+            offset (int): depth of direct children, used when the frame is
+                displayed inside a node group.
+
+        Returns:
+            dict[str, int]: node name -> depth
+        """
+        depths = self._depths.get((top_level_frame, offset))
+        if depths is None:
+            depths = {}
+            descendants = []
+            stack = [(top_level_frame, offset)]
+            while stack:
+                parent, depth = stack.pop()
+                for node in self.children.get(parent, ()):
+                    depths[node.name] = depth
+                    descendants.append(node)
+                for frame in self.frames.get(parent, ()):
+                    depths[frame.name] = depth
+                    stack.append((frame.name, depth + 1))
+            self._depths[(top_level_frame, offset)] = depths
+            self._descendants[top_level_frame] = descendants
+        return depths
+
+    def root_exposed_frames(self):
+        """Return exposed frames that are not inside another exposed frame.
+
+        These are the frames shown when the tree is displayed as a node group.
+
+        Returns:
+            list[bpy.types.NodeFrame]: frames sorted by label
+        """
+        if self._root_exposed_frames is None:
+            roots = []
+            for frame in self.exposed_frames:
+                parent = frame.parent
+                while parent is not None and parent.name not in self.exposed_names:
+                    parent = parent.parent
+                if parent is None:
+                    roots.append(frame)
+            self._root_exposed_frames = roots
+        return self._root_exposed_frames
+
+    def descendants(self, top_level_frame):
+        """Return displayed non frame nodes anywhere below top_level_frame.
+
+        Args:
+            top_level_frame (str): name of top level frame
+
+        Returns:
+            list[bpy.types.Node]: nodes
+        """
+        self.depths(top_level_frame)
+        return self._descendants[top_level_frame]
+
+    def search_index(self, top_level_frame):
+        """Return search index of the nodes below top_level_frame.
+
+        Args:
+            top_level_frame (str): name of top level frame
+
+        Returns:
+            SearchIndex: search index
+        """
+        index = self._search_indices.get(top_level_frame)
+        if index is None:
+            index = SearchIndex(self.descendants(top_level_frame))
+            self._search_indices[top_level_frame] = index
+        return index
+
+
+def get_signature(nodes):
+    """Return pointer, name and parent name of every node.
+
+    Adding, deleting, renaming or re-parenting a node changes the signature,
+    including re-parenting done in C by the node editor, which msgbus
+    doesn't report. The pointer catches a deleted node replaced by a new one
+    of the same name.
+
+    Args:
+        nodes (bpy.types.Nodes): nodes of a node tree
+
+    Returns:
+        tuple[tuple[int, str, str | None]]: node pointers, names and parent names
+    """
+    return tuple(
+        (n.as_pointer(), n.name, n.parent.name if n.parent else None) for n in nodes)
+
+
+def get_hierarchy(tree):
+    """Return cached FrameHierarchy for tree, building it if necessary.
+
+    The signature is checked on every call so that added, deleted, renamed
+    or re-parented nodes are picked up even if the tree was not explicitly
+    invalidated, and the cache never hands out nodes that were deleted.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+
+    Returns:
+        FrameHierarchy: hierarchy index
+    """
+    key = tree.as_pointer()
+    hierarchy = _hierarchies.get(key)
+    if hierarchy is None or hierarchy.signature != get_signature(tree.nodes):
+        hierarchy = FrameHierarchy(tree)
+        _hierarchies[key] = hierarchy
+    return hierarchy
+
+
+def is_stale(tree):
+    """Return True if tree has a cached hierarchy and nodes have since been added, deleted, renamed or re-parented.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+
+    Returns:
+        bool: True if cached hierarchy is out of date
+    """
+    hierarchy = _hierarchies.get(tree.as_pointer())
+    return hierarchy is not None and hierarchy.signature != get_signature(tree.nodes)
+
+
+def invalidate_hierarchy(tree):
+    """Discard cached hierarchy of tree.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+    """
+    _hierarchies.pop(tree.as_pointer(), None)
+
+
+def clear_hierarchies():
+    """Discard all cached hierarchies."""
+    _hierarchies.clear()
@@ -0,0 +1,69 @@
+"""Key all exposed values below a top level frame in one pass.
+
+Values are read in bulk through the snapshot layout and written straight into
+the F-curves of the node tree's action. F-curves without keys get their points
+added with keyframe_points.add and foreach_set. F-curves that already have
+keys use the fast keyframe insert, with handles recalculated once per curve
+after all keys are in. This avoids resolving an RNA path and tagging the
+depsgraph per socket as keyframe_insert does. Linked inputs are skipped as
+their keys would have no effect.
+"""
+import bpy
+from .snapshot import get_layout
+
+
+def get_action(tree):
+    """Return action of node tree, creating it if needed.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+
+    Returns:
+        bpy.types.Action: action
+    """
+    anim = tree.animation_data or tree.animation_data_create()
+    if anim.action is None:
+        anim.action = bpy.data.actions.new(tree.name + 'Action')
+    return anim.action
+
+
+def key_exposed(tree, top_level_frame, frame):
+    """Key every exposed value below a top level frame at frame.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+        top_level_frame (str): name of top level frame
+        frame (float): frame to key at
+
+    Returns:
+        int: number of keys inserted
+    """
+    layout = get_layout(tree, top_level_frame)
+    values = layout.capture()
+    action = get_action(tree)
+    fcurves = {(fc.data_path, fc.array_index): fc for fc in action.fcurves}
+
+    inserted = 0
+    updated = []
+    for node, socket, kind, offset, length in layout.sockets:
+        if socket.is_linked:
+            # keys on a linked input have no effect
+            continue
+        data_path = socket.path_from_id('default_value')
+        for index in range(max(length, 1)):
+            fcurve = fcurves.get((data_path, index))
+            if fcurve is None:
+                fcurve = action.fcurves.new(data_path, index=index, action_group=node.name)
+                fcurves[data_path, index] = fcurve
+            value = values[kind][offset + index]
+            points = fcurve.keyframe_points
+            if len(points):
+                points.insert(frame, value, options={'FAST'})
+            else:
+                points.add(1)
+                points.foreach_set('co', (frame, value))
+            updated.append(fcurve)
+            inserted += 1
+    for fcurve in updated:
+        fcurve.update()
+    return inserted
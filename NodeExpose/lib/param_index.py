@@ -0,0 +1,309 @@
+"""Flat index of every exposed parameter in the file.
+
+Rows are kept per node tree along with the version of the tree's frame
+hierarchy they were built from. The node trees listed for each material,
+object, scene and texture are recorded, and the depsgraph handler passes the
+IDs it reports as updated, so a refresh only looks at the trees of those IDs
+and rebuilds the rows of the ones whose hierarchy changed. Everything is
+rescanned when a datablock is added or removed. Rows hold the socket itself
+so the value column can be drawn without looking anything up.
+
+Filter and sort results are cached against the index version so the UIList
+hooks that call them on every redraw only do work when the rows or the filter
+changed.
+"""
+from collections import namedtuple
+import bpy
+from .batch import iter_exposed_sockets
+from .hierarchy import get_hierarchy
+from .registry import has_exposed_frames
+from .utils import get_node_label
+
+Row = namedtuple('Row', 'owner_type owner frame node socket_name text socket')
+
+# bpy.data collections of the IDs node trees are listed for, with their type
+SOURCE_TYPES = (
+    ('materials', bpy.types.Material),
+    ('objects', bpy.types.Object),
+    ('scenes', bpy.types.Scene),
+    ('textures', bpy.types.Texture))
+
+# collections whose length is checked to catch added and removed datablocks
+COUNTED_COLLECTIONS = ('materials', 'objects', 'node_groups', 'scenes', 'textures')
+
+_index = None
+
+
+def get_source_trees(id_data):
+    """Return node trees listed for a material, object, scene or texture.
+
+    Args:
+        id_data (bpy.types.ID): material, object, scene or texture
+
+    Returns:
+        dict[int, tuple[str, bpy.types.ID, bpy.types.NodeTree]]: tree pointer ->
+            owner type, ID the owner name is read from and node tree
+    """
+    trees = {}
+    if isinstance(id_data, bpy.types.Material):
+        if id_data.node_tree is not None:
+            trees[id_data.node_tree.as_pointer()] = ('MATERIAL', id_data, id_data.node_tree)
+    elif isinstance(id_data, bpy.types.Object):
+        for mod in id_data.modifiers:
+            if mod.type == 'NODES' and mod.node_group is not None:
+                group = mod.node_group
+                trees[group.as_pointer()] = ('GEOMETRY', group, group)
+    elif isinstance(id_data, bpy.types.Scene):
+        if id_data.node_tree is not None:
+            trees[id_data.node_tree.as_pointer()] = ('COMPOSITOR', id_data, id_data.node_tree)
+    elif isinstance(id_data, bpy.types.Texture):
+        if id_data.use_nodes and id_data.node_tree is not None:
+            trees[id_data.node_tree.as_pointer()] = ('TEXTURE', id_data, id_data.node_tree)
+    return trees
+
+
+def iter_sources():
+    """Yield every material, object, scene and texture with the node trees listed for it.
+
+    Yields:
+        tuple[int, dict]: ID pointer and trees as returned by get_source_trees
+    """
+    for collection, _ in SOURCE_TYPES:
+        for id_data in getattr(bpy.data, collection):
+            yield id_data.as_pointer(), get_source_trees(id_data)
+
+
+def iter_trees():
+    """Yield every node tree that exposed parameters are listed for.
+
+    Yields:
+        tuple[str, str, bpy.types.NodeTree]: owner type, owner name and node tree
+    """
+    listed = {}
+    for _, trees in iter_sources():
+        listed.update(trees)
+    for owner_type, owner, tree in listed.values():
+        yield owner_type, owner.name, tree
+
+
+def get_update_key(id_data):
+    """Return key an ID updated by the depsgraph is recorded under.
+
+    Args:
+        id_data (bpy.types.ID): original ID
+
+    Returns:
+        tuple | None: ('TREE', pointer) for node trees, collection, name and
+            pointer for IDs trees are listed for, None for anything else
+    """
+    if isinstance(id_data, bpy.types.NodeTree):
+        return ('TREE', id_data.as_pointer())
+    for collection, id_type in SOURCE_TYPES:
+        if isinstance(id_data, id_type):
+            return (collection, id_data.name, id_data.as_pointer())
+    return None
+
+
+def get_counts():
+    return tuple(len(getattr(bpy.data, c)) for c in COUNTED_COLLECTIONS)
+
+
+def build_rows(owner_type, owner, tree):
+    """Return rows of the exposed parameters of a single node tree.
+
+    Args:
+        owner_type (str): 'MATERIAL', 'GEOMETRY', 'COMPOSITOR' or 'TEXTURE'
+        owner (str): name of the material, node group, scene or texture
+        tree (bpy.types.NodeTree): node tree
+
+    Returns:
+        list[Row]: rows
+    """
+    rows = []
+    for frame in get_hierarchy(tree).root_exposed_frames():
+        for node, socket in iter_exposed_sockets(tree, frame.name):
+            frame_label = get_node_label(node.parent)
+            node_label = get_node_label(node)
+            socket_name = socket.label or socket.name
+            text = '\n'.join((owner, frame_label, node_label, socket_name)).lower()
+            rows.append(Row(owner_type, owner, frame_label, node_label,
+                            socket_name, text, socket))
+    return rows
+
+
+class ParameterIndex:
+    """Rows of all exposed parameters, grouped by node tree."""
+
+    def __init__(self):
+        # ID pointer -> trees listed for it, see get_source_trees
+        self.sources = {}
+        # tree pointer -> (hierarchy version, owner name, rows)
+        self.trees = {}
+        self.counts = None
+        # keys of updated IDs, None to rescan everything
+        self.updated = None
+        self.rows = []
+        self.version = 0
+        self.dirty = True
+        self._filter_key = None
+        self._filter = ([], [])
+
+    def mark_dirty(self, ids=None):
+        """Request a refresh of the rows of ids, or of everything.
+
+        Args:
+            ids (iterable[bpy.types.ID], optional): IDs reported as updated,
+                None to rescan every ID
+        """
+        if ids is None:
+            self.updated = None
+            self.dirty = True
+            return
+        keys = {key for key in map(get_update_key, ids) if key is not None}
+        if self.updated is not None:
+            self.updated.update(keys)
+        # removing a datablock doesn't always report an ID rows are listed for
+        if keys or get_counts() != self.counts:
+            self.dirty = True
+
+    def _update_sources(self, updated):
+        """Re-read the trees listed for updated IDs.
+
+        Args:
+            updated (set[tuple]): keys as returned by get_update_key
+
+        Returns:
+            tuple[set[int], set[int]] | None: pointers of updated sources and
+                updated trees, None if an ID has since been renamed or removed
+        """
+        sources = set()
+        trees = set()
+        for key in updated:
+            if key[0] == 'TREE':
+                trees.add(key[1])
+                continue
+            collection, name, pointer = key
+            id_data = getattr(bpy.data, collection).get(name)
+            if id_data is None or id_data.as_pointer() != pointer:
+                return None
+            self.sources[pointer] = get_source_trees(id_data)
+            sources.add(pointer)
+        return sources, trees
+
+    def refresh(self):
+        """Rebuild rows of trees that changed since the last refresh.
+
+        Only the trees of IDs passed to mark_dirty are looked at, unless a
+        datablock was added or removed, in which case every ID is rescanned.
+
+        Returns:
+            bool: whether any rows changed
+        """
+        self.dirty = False
+        updated = self.updated
+        self.updated = set()
+        counts = get_counts()
+        candidates = None
+        if updated is not None and counts == self.counts:
+            candidates = self._update_sources(updated)
+        if candidates is None:
+            self.counts = counts
+            self.sources = dict(iter_sources())
+
+        listed = {}
+        for source_trees in self.sources.values():
+            listed.update(source_trees)
+        if candidates is None:
+            check = listed
+        else:
+            sources, tree_keys = candidates
+            check = {}
+            for pointer in sources:
+                check.update(self.sources[pointer])
+            for key in tree_keys:
+                if key in listed:
+                    check[key] = listed[key]
+
+        trees = {key: cached for key, cached in self.trees.items() if key in listed}
+        changed = len(trees) != len(self.trees)
+        for key, (owner_type, owner_id, tree) in check.items():
+            if not has_exposed_frames(tree):
+                if trees.pop(key, None) is not None:
+                    changed = True
+                continue
+            owner = owner_id.name
+            version = get_hierarchy(tree).version
+            cached = trees.get(key)
+            if cached is None or cached[0] != version or cached[1] != owner:
+                trees[key] = (version, owner, build_rows(owner_type, owner, tree))
+                changed = True
+        self.trees = trees
+        if changed:
+            self.rows = [row for _, _, rows in trees.values() for row in rows]
+            self.version += 1
+        return changed
+
+    def filter(self, filter_name, sort_alpha, flag):
+        """Return UIList filter flags and display order of the rows.
+
+        Inverting the filter and reversing the order are applied by the
+        UIList itself.
+
+        Args:
+            filter_name (str): text that owner, frame, node or socket must contain
+            sort_alpha (bool): sort by node then socket label
+            flag (int): flag value of rows that should be shown
+
+        Returns:
+            tuple[list[int], list[int]]: filter flags and new index of each row
+        """
+        key = (self.version, filter_name, sort_alpha)
+        if key == self._filter_key:
+            return self._filter
+        rows = self.rows
+        query = filter_name.strip().lower()
+        if query:
+            flags = [flag if query in row.text else 0 for row in rows]
+        else:
+            flags = []
+
+        order = []
+        if sort_alpha:
+            ordered = sorted(range(len(rows)), key=lambda i: (
+                rows[i].node.lower(), rows[i].socket_name.lower()))
+            order = [0] * len(rows)
+            for new_index, old_index in enumerate(ordered):
+                order[old_index] = new_index
+
+        self._filter_key = key
+        self._filter = (flags, order)
+        return self._filter
+
+
+def get_parameter_index():
+    """Return the parameter index, creating it if necessary.
+
+    Returns:
+        ParameterIndex: index
+    """
+    global _index
+    if _index is None:
+        _index = ParameterIndex()
+    return _index
+
+
+def mark_parameter_index_dirty(ids=None):
+    """Request a refresh of the parameter index before it is next drawn.
+
+    Args:
+        ids (iterable[bpy.types.ID], optional): IDs reported as updated,
+            None to rescan every ID
+    """
+    if _index is not None:
+        _index.mark_dirty(ids)
+
+
+def clear_parameter_index():
+    """Discard parameter index, e.g. after undo or file load."""
+    global _index
+    _index = None
@@ -0,0 +1,274 @@
+"""On disk library of snapshots of exposed values.
+
+Each preset is a file holding a short JSON header followed by the sections of
+a snapshot (see snapshot.capture). The header records the preset name, the key
+of the frame layout it was captured from and where each section starts, so
+listing presets only reads headers. When a preset is applied its file is
+memory mapped and the sections are handed to snapshot.restore as views into
+the mapping, so values are only decompressed there and nothing is copied
+first.
+
+Headers of every preset in a directory are kept in an index file next to the
+presets and in memory, keyed by file name, modification time and size, so
+headers are only re-read for files that were added or changed since the
+index was written.
+"""
+from contextlib import contextmanager
+import json
+import mmap
+import os
+import struct
+
+from .snapshot import capture, restore
+
+MAGIC = b'NEP1'
+EXTENSION = '.nepreset'
+INDEX_FILE = '.nepreset_index.json'
+SECTIONS = ('layout', 'paths', 'values', 'node_props')
+
+_indices = {}
+
+
+def write_preset(filepath, name, snapshot):
+    """Write a snapshot to a preset file.
+
+    Args:
+        filepath (str): path of file to write
+        name (str): preset name
+        snapshot (dict): snapshot made by snapshot.capture
+    """
+    data = {
+        'layout': snapshot['layout'].encode(),
+        'paths': snapshot['paths'],
+        'values': snapshot['values'],
+        'node_props': snapshot['node_props'].encode()}
+    sections = {}
+    offset = 0
+    for section in SECTIONS:
+        sections[section] = (offset, len(data[section]))
+        offset += len(data[section])
+    header = json.dumps({
+        'name': name,
+        'layout': snapshot['layout'],
+        'sections': sections}).encode()
+
+    tmp = filepath + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC + struct.pack('<I', len(header)) + header)
+        for section in SECTIONS:
+            f.write(data[section])
+    os.replace(tmp, filepath)
+
+
+def read_header(filepath):
+    """Return header of a preset file without reading the rest of it.
+
+    Args:
+        filepath (str): path of preset file
+
+    Returns:
+        dict: name, layout key and section offsets
+
+    Raises:
+        ValueError: file is not a Node Expose preset
+    """
+    with open(filepath, 'rb') as f:
+        start = f.read(8)
+        if len(start) < 8 or start[:4] != MAGIC:
+            raise ValueError("Not a Node Expose preset: " + filepath)
+        header_length = struct.unpack('<I', start[4:])[0]
+        header = json.loads(f.read(header_length))
+    header['data_start'] = 8 + header_length
+    return header
+
+
+@contextmanager
+def open_preset(filepath, header):
+    """Memory map a preset file and yield its snapshot.
+
+    The layout key is taken from the header. The other sections are views
+    into the mapping and are only valid inside the with block.
+
+    Args:
+        filepath (str): path of preset file
+        header (dict): header of file returned by read_header
+
+    Yields:
+        dict: snapshot that can be passed to snapshot.restore
+    """
+    with open(filepath, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start = header['data_start']
+            view = memoryview(data)
+            sections = {
+                section: view[start + offset:start + offset + length]
+                for section, (offset, length) in header['sections'].items()
+                if section != 'layout'}
+            try:
+                yield dict(sections, layout=header['layout'])
+            finally:
+                for section in sections.values():
+                    section.release()
+                view.release()
+
+
+class PresetIndex:
+    """Headers of the preset files in a directory.
+
+    Args:
+        directory (str): preset directory
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.entries = {}
+        self.version = 0
+        self.load()
+
+    def load(self):
+        """Read index file written by save, if there is one."""
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE)) as f:
+                self.entries = {
+                    filename: (mtime, size, header)
+                    for filename, (mtime, size, header) in json.load(f).items()}
+        except (OSError, ValueError, TypeError):
+            self.entries = {}
+
+    def save(self):
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE), 'w') as f:
+                json.dump(self.entries, f)
+        except OSError:
+            pass
+
+    def refresh(self):
+        """Re-read headers of preset files added or changed since the last refresh.
+
+        Every file's modification time and size is checked, so presets that
+        were overwritten in place are picked up as well as new ones.
+
+        Returns:
+            bool: whether the index changed
+        """
+        try:
+            dir_entries = list(os.scandir(self.directory))
+        except OSError:
+            return False
+
+        entries = {}
+        changed = False
+        for entry in dir_entries:
+            if not entry.name.endswith(EXTENSION) or not entry.is_file():
+                continue
+            stat = entry.stat()
+            cached = self.entries.get(entry.name)
+            if cached and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+                entries[entry.name] = cached
+                continue
+            try:
+                entries[entry.name] = (stat.st_mtime, stat.st_size, read_header(entry.path))
+                changed = True
+            except (OSError, ValueError):
+                pass
+        if changed or entries.keys() != self.entries.keys():
+            self.entries = entries
+            self.version += 1
+            self.save()
+            return True
+        return False
+
+    def presets_for(self, layout_key):
+        """Return presets captured from frames with the given layout.
+
+        Args:
+            layout_key (str): SnapshotLayout.key
+
+        Returns:
+            list[tuple[str, str]]: file name and preset name, sorted by name
+        """
+        return sorted(
+            ((filename, header['name'])
+             for filename, (_, _, header) in self.entries.items()
+             if header['layout'] == layout_key),
+            key=lambda preset: preset[1].lower())
+
+
+def get_preset_index(directory):
+    """Return preset index of directory.
+
+    The index isn't refreshed here, as it is looked up by the preset enum's
+    items callback on every redraw. Call refresh where the directory may
+    have changed, e.g. when the preset popup is opened.
+
+    Args:
+        directory (str): preset directory
+
+    Returns:
+        PresetIndex: index
+    """
+    index = _indices.get(directory)
+    if index is None:
+        index = _indices[directory] = PresetIndex(directory)
+    return index
+
+
+def save_preset(directory, name, tree, top_level_frame, overwrite=False):
+    """Capture exposed values below a top level frame and write them to the library.
+
+    Args:
+        directory (str): preset directory
+        name (str): preset name
+        tree (bpy.types.NodeTree): node tree
+        top_level_frame (str): name of top level frame
+        overwrite (bool): replace a preset saved under the same file name
+
+    Returns:
+        str: path of written file
+
+    Raises:
+        FileExistsError: a preset with the same file name exists and overwrite is False
+    """
+    os.makedirs(directory, exist_ok=True)
+    filename = safe_filename(name) + EXTENSION
+    filepath = os.path.join(directory, filename)
+    if not overwrite and os.path.exists(filepath):
+        raise FileExistsError("Preset %s already exists" % filename)
+    write_preset(filepath, name, capture(tree, top_level_frame))
+    return filepath
+
+
+def apply_preset(directory, filename, tree, top_level_frame):
+    """Restore exposed values below a top level frame from a preset file.
+
+    Args:
+        directory (str): preset directory
+        filename (str): preset file name
+        tree (bpy.types.NodeTree): node tree
+        top_level_frame (str): name of top level frame
+
+    Returns:
+        int: number of sockets written
+
+    Raises:
+        KeyError: preset is not in the index
+    """
+    index = get_preset_index(directory)
+    # make sure the header matches the file if it was overwritten since the popup opened
+    index.refresh()
+    header = index.entries[filename][2]
+    filepath = os.path.join(directory, filename)
+    with open_preset(filepath, header) as snapshot:
+        return restore(tree, top_level_frame, snapshot)
+
+
+def safe_filename(name):
+    """Return name with characters that aren't allowed in file names replaced.
+
+    Args:
+        name (str): name
+
+    Returns:
+        str: file name without extension
+    """
+    return ''.join(c if c.isalnum() or c in ' -_.' else '_' for c in name).strip() or 'preset'
@@ -0,0 +1,208 @@
+"""Recording stand-in for bpy.types.UILayout.
+
+Lets the drawing functions in panels.py run headless. Every layout call is
+captured into a Recorder along with per call counts, and the time spent
+drawing each node is attributed to its node type.
+
+    recorder = Recorder()
+    panel = RecordingPanel(recorder)
+    with recorder.patch(panels):
+        panels.display_frame(panel, context, nodes, frame, frame.name)
+    print(recorder.counts, recorder.node_timings)
+"""
+import difflib
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+def describe(value):
+    """Return stable text description of a value passed to a layout call.
+
+    Args:
+        value (any): argument
+
+    Returns:
+        str: description
+    """
+    path_from_id = getattr(value, 'path_from_id', None)
+    if path_from_id is not None:
+        try:
+            return '%s.%s' % (value.id_data.name, path_from_id())
+        except (AttributeError, ValueError):
+            return type(value).__name__
+    return repr(value)
+
+
+class Recorder:
+    """Collects the widget stream emitted into RecordingLayouts."""
+
+    def __init__(self):
+        self.stream = []
+        self.counts = Counter()
+        self.node_timings = {}
+        self._start = time.perf_counter()
+
+    def record(self, depth, op, args=(), kwargs=None):
+        """Record a layout call.
+
+        Args:
+            depth (int): nesting depth of the layout the call was made on
+            op (str): layout method name
+            args (tuple): positional arguments
+            kwargs (dict, optional): keyword arguments
+        """
+        described = [describe(a) for a in args]
+        described.extend(
+            '%s=%s' % (k, describe(v)) for k, v in sorted((kwargs or {}).items()))
+        self.stream.append(
+            (time.perf_counter() - self._start, depth, op, ', '.join(described)))
+        self.counts[op] += 1
+
+    def add_node_timing(self, node, seconds):
+        """Attribute draw time to the type of node.
+
+        Args:
+            node (bpy.types.Node): node that was drawn
+            seconds (float): time taken
+        """
+        timing = self.node_timings.setdefault(node.bl_idname, [0, 0.0])
+        timing[0] += 1
+        timing[1] += seconds
+
+    def lines(self):
+        """Return widget stream as indented text lines, without timings.
+
+        Returns:
+            list[str]: lines
+        """
+        return ['%s%s(%s)' % ('  ' * depth, op, args)
+                for _, depth, op, args in self.stream]
+
+    def diff(self, other):
+        """Return unified diff between this and another recorder's widget stream.
+
+        Args:
+            other (Recorder): recorder to compare against
+
+        Returns:
+            list[str]: diff lines, empty if streams are identical
+        """
+        return list(difflib.unified_diff(
+            other.lines(), self.lines(), 'before', 'after', lineterm=''))
+
+    def to_dict(self):
+        """Return recorded data in a JSON serialisable form.
+
+        Returns:
+            dict: counts, node timings and widget stream
+        """
+        return {
+            'counts': dict(self.counts),
+            'node_timings': {
+                k: {'count': c, 'total_ms': t * 1000}
+                for k, (c, t) in self.node_timings.items()},
+            'stream': self.lines(),
+        }
+
+    @contextmanager
+    def patch(self, panels):
+        """Patch the drawing helpers of the panels module to record instead of drawing.
+
+        Node buttons and sockets are drawn by Blender's C API, which only
+        accepts a real UILayout, so they are recorded as single calls. Calls
+        to display_node are timed per node type.
+
+        Args:
+            panels (module): NodeExpose.panels
+        """
+        originals = (panels.draw_node_buttons,
+                     panels.draw_socket,
+                     panels.display_node)
+        display_node = panels.display_node
+
+        def draw_node_buttons(context, layout, node):
+            layout.recorder.record(layout.depth, 'draw_buttons', (node,))
+
+        def draw_socket(context, layout, node, socket):
+            layout.recorder.record(layout.depth, 'draw_socket', (socket,))
+
+        def timed_display_node(panel, context, node_label, node, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                display_node(panel, context, node_label, node, *args, **kwargs)
+            finally:
+                self.add_node_timing(node, time.perf_counter() - start)
+
+        panels.draw_node_buttons = draw_node_buttons
+        panels.draw_socket = draw_socket
+        panels.display_node = timed_display_node
+        try:
+            yield self
+        finally:
+            (panels.draw_node_buttons,
+             panels.draw_socket,
+             panels.display_node) = originals
+
+
+class RecordingLayout:
+    """Implements the UILayout calls used by panels.py and records them.
+
+    Args:
+        recorder (Recorder): recorder to record calls into
+        depth (int): nesting depth of this layout
+    """
+
+    def __init__(self, recorder, depth=0):
+        self.recorder = recorder
+        self.depth = depth
+        self.alignment = 'EXPAND'
+        self.enabled = True
+        self.active = True
+
+    def _sublayout(self, op, kwargs):
+        self.recorder.record(self.depth, op, (), kwargs)
+        return RecordingLayout(self.recorder, self.depth + 1)
+
+    def row(self, **kwargs):
+        return self._sublayout('row', kwargs)
+
+    def column(self, **kwargs):
+        return self._sublayout('column', kwargs)
+
+    def box(self, **kwargs):
+        return self._sublayout('box', kwargs)
+
+    def split(self, **kwargs):
+        return self._sublayout('split', kwargs)
+
+    def prop(self, data, prop_name, **kwargs):
+        self.recorder.record(self.depth, 'prop', (data, prop_name), kwargs)
+
+    def operator(self, idname, **kwargs):
+        self.recorder.record(self.depth, 'operator', (idname,), kwargs)
+        return OperatorProperties()
+
+    def label(self, **kwargs):
+        self.recorder.record(self.depth, 'label', (), kwargs)
+
+    def separator(self, **kwargs):
+        self.recorder.record(self.depth, 'separator', (), kwargs)
+
+    def context_pointer_set(self, name, data):
+        self.recorder.record(self.depth, 'context_pointer_set', (name, data))
+
+
+class OperatorProperties:
+    """Accepts operator properties set on the result of RecordingLayout.operator."""
+
+
+class RecordingPanel:
+    """Stand-in for the panel passed to the display functions as self.
+
+    Args:
+        recorder (Recorder): recorder to record calls into
+    """
+
+    def __init__(self, recorder):
+        self.layout = RecordingLayout(recorder)
@@ -0,0 +1,283 @@
+"""Registry of exposed frames per node tree.
+
+Lets panel polls check whether a node tree has exposed frames with a
+dictionary lookup instead of scanning its nodes. Each entry is filled in by a
+single scan the first time a tree is looked up and is then kept up to date by
+the expose_frame update callback and by revalidate_tree, which is called for
+node trees reported as changed by the depsgraph.
+
+It also keeps an index of node based textures that contain exposed frames so
+texture panels don't have to walk bpy.data.textures.
+"""
+from itertools import count
+import bpy
+
+_registry = {}
+_texture_index = None
+_texture_versions = count(1)
+# changes whenever a tree gains or loses exposed frames
+_exposure_versions = count(1)
+_exposure_version = next(_exposure_versions)
+# object pointer -> version, changed when the object's modifiers may have changed
+_object_versions = {}
+
+
+class ExposedFrames:
+    """Exposed frames of a single node tree.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree to scan
+    """
+
+    def __init__(self, tree):
+        nodes = tree.nodes
+        self.num_nodes = len(nodes)
+        # keyed on the frames' ne_node_props so the expose_frame update
+        # callback, which only has the property group, can find them.
+        self.frames = {
+            n.ne_node_props.as_pointer(): n.name for n in nodes
+            if n.type == 'FRAME' and n.ne_node_props.expose_frame}
+
+    def is_valid(self, tree):
+        """Return True if tree has the same number of nodes and still has every exposed frame.
+
+        Only the recorded frames are looked up, so this is cheap enough to
+        run on every update of the tree.
+
+        Args:
+            tree (bpy.types.NodeTree): node tree
+
+        Returns:
+            bool: True if entry is up to date
+        """
+        nodes = tree.nodes
+        if len(nodes) != self.num_nodes:
+            return False
+        for pointer, name in self.frames.items():
+            node = nodes.get(name)
+            if node is None or node.ne_node_props.as_pointer() != pointer \
+                    or not node.ne_node_props.expose_frame:
+                return False
+        return True
+
+
+def _bump_exposure_version():
+    global _exposure_version
+    _exposure_version = next(_exposure_versions)
+
+
+def exposure_version():
+    """Return version that changes whenever any tree gains or loses exposed frames.
+
+    Returns:
+        int: version
+    """
+    return _exposure_version
+
+
+def object_version(obj):
+    """Return version of obj's modifier stack as recorded by touch_object.
+
+    Args:
+        obj (bpy.types.Object): object
+
+    Returns:
+        int: version
+    """
+    return _object_versions.get(obj.as_pointer(), 0)
+
+
+def touch_object(obj):
+    """Record that obj's modifiers may have been added, removed or changed.
+
+    Args:
+        obj (bpy.types.Object): object
+    """
+    key = obj.as_pointer()
+    _object_versions[key] = _object_versions.get(key, 0) + 1
+
+
+def _get_entry(tree):
+    key = tree.as_pointer()
+    entry = _registry.get(key)
+    if entry is None:
+        entry = ExposedFrames(tree)
+        _registry[key] = entry
+    return entry
+
+
+def has_exposed_frames(tree):
+    """Return True if tree contains exposed frames.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+
+    Returns:
+        bool: True if tree contains exposed frames
+    """
+    return bool(_get_entry(tree).frames)
+
+
+def iter_exposing_node_modifiers(obj):
+    """Yield obj's geometry nodes modifiers whose node group has exposed frames.
+
+    Exposure is looked up per node group datablock, so every object using the
+    same group shares a single entry.
+
+    Args:
+        obj (bpy.types.Object): object
+
+    Yields:
+        bpy.types.NodesModifier: modifier
+    """
+    for mod in obj.modifiers:
+        if mod.type == 'NODES' and mod.node_group is not None \
+                and has_exposed_frames(mod.node_group):
+            yield mod
+
+
+def set_frame_exposed(node_props):
+    """Record that a frame has been exposed or hidden.
+
+    Args:
+        node_props (NODE_EXPOSE_Node_Props): node properties of the frame
+    """
+    tree = node_props.id_data
+    entry = _registry.get(tree.as_pointer())
+    if entry is None:
+        return
+    if node_props.expose_frame:
+        node = tree.path_resolve(node_props.path_from_id().rpartition('.')[0])
+        entry.frames[node_props.as_pointer()] = node.name
+    else:
+        entry.frames.pop(node_props.as_pointer(), None)
+    _bump_exposure_version()
+
+
+def revalidate_tree(tree):
+    """Drop entry of tree if nodes have been added, deleted or renamed since it was built.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+
+    Returns:
+        bool: True if entry was dropped
+    """
+    key = tree.as_pointer()
+    entry = _registry.get(key)
+    if entry is not None and not entry.is_valid(tree):
+        del _registry[key]
+        _bump_exposure_version()
+        return True
+    return False
+
+
+def clear_registry():
+    """Drop all entries."""
+    global _texture_index
+    _registry.clear()
+    _object_versions.clear()
+    _texture_index = None
+    _bump_exposure_version()
+
+
+class TextureIndex:
+    """Index of node based textures that contain exposed frames."""
+
+    def __init__(self):
+        textures = bpy.data.textures
+        self.num_textures = len(textures)
+        self.trees = {}
+        self.exposed = set()
+        for texture in textures:
+            tree = texture.node_tree
+            if tree is None:
+                continue
+            self.trees[tree.as_pointer()] = texture.name
+            if has_exposed_frames(tree):
+                self.exposed.add(texture.name)
+        self.names = sorted(self.exposed)
+        self.version = next(_texture_versions)
+
+    def update_tree(self, tree):
+        """Update exposure of the texture owning tree.
+
+        Args:
+            tree (bpy.types.TextureNodeTree): texture node tree
+
+        Returns:
+            bool: False if tree is not in the index.
+        """
+        name = self.trees.get(tree.as_pointer())
+        if name is None:
+            return False
+        if has_exposed_frames(tree):
+            self.exposed.add(name)
+        else:
+            self.exposed.discard(name)
+        names = sorted(self.exposed)
+        if names != self.names:
+            self.names = names
+            self.version = next(_texture_versions)
+        return True
+
+    def is_valid(self):
+        """Return True if no texture has been added or removed and every exposed texture still exists.
+
+        Exposed textures are looked up by name, so a texture that was removed
+        or renamed is caught even if another was added in its place.
+
+        Returns:
+            bool: True if index is up to date
+        """
+        textures = bpy.data.textures
+        if len(textures) != self.num_textures:
+            return False
+        for name in self.exposed:
+            texture = textures.get(name)
+            if texture is None or texture.node_tree is None \
+                    or self.trees.get(texture.node_tree.as_pointer()) != name:
+                return False
+        return True
+
+
+def get_texture_index():
+    """Return index of node based textures, building it if necessary.
+
+    Returns:
+        TextureIndex: texture index
+    """
+    global _texture_index
+    if _texture_index is None or not _texture_index.is_valid():
+        _texture_index = TextureIndex()
+    return _texture_index
+
+
+def exposed_texture_names():
+    """Return sorted names of textures that contain exposed frames.
+
+    Returns:
+        list[str]: texture names
+    """
+    return get_texture_index().names
+
+
+def texture_index_version():
+    """Return version of texture index, which changes whenever its names do.
+
+    Returns:
+        int: version
+    """
+    return get_texture_index().version
+
+
+def update_texture_tree(tree):
+    """Update texture index after a texture node tree has changed.
+
+    Args:
+        tree (bpy.types.TextureNodeTree): texture node tree
+    """
+    global _texture_index
+    if _texture_index is not None and not _texture_index.update_tree(tree):
+        _texture_index = None
+
@@ -0,0 +1,64 @@
+"""Search index over the labels and input socket names of exposed nodes.
+
+An index is built once per top level frame, together with the frame
+hierarchy it belongs to, and is discarded with it. Searches reuse the
+results of the previous query when the new query extends it, so typing a
+search term narrows the last result set instead of rescanning every node.
+"""
+from .utils import get_node_label
+
+
+class SearchIndex:
+    """Searchable text of a list of nodes.
+
+    Args:
+        nodes (list[bpy.types.Node]): nodes to index
+    """
+
+    def __init__(self, nodes):
+        self.entries = []
+        for node in nodes:
+            node_text = (get_node_label(node) + '\n' + node.name).lower()
+            sockets = [
+                (socket, (socket.label or socket.name).lower())
+                for socket in node.inputs]
+            self.entries.append((node, node_text, sockets))
+        self.entries.sort(key=lambda entry: entry[1])
+        self._last_query = None
+        self._last_results = []
+        self._last_matches = []
+
+    def search(self, query):
+        """Return nodes whose label or name, or any of whose input sockets, match query.
+
+        Args:
+            query (str): case insensitive text to search for
+
+        Returns:
+            list[tuple[bpy.types.Node, list[bpy.types.NodeSocket] | None]]:
+                matching nodes, each with the matching sockets or None if
+                the node itself matched.
+        """
+        query = query.strip().lower()
+        if query == self._last_query:
+            return self._last_matches
+
+        if self._last_query and query.startswith(self._last_query):
+            candidates = [entry for entry, _ in self._last_results]
+        else:
+            candidates = self.entries
+
+        results = []
+        for entry in candidates:
+            node, node_text, sockets = entry
+            if query in node_text:
+                results.append((entry, None))
+                continue
+            matched = [socket for socket, name in sockets if query in name]
+            if matched:
+                results.append((entry, matched))
+
+        self._last_query = query
+        self._last_results = results
+        self._last_matches = [(entry[0], sockets) for entry, sockets in results]
+        return self._last_matches
@@ -0,0 +1,410 @@
+"""Capture and restore all exposed values below a top level frame.
+
+Socket values are packed into two arrays in a fixed layout: a float array
+for float sockets and the components of vector and colour sockets, and an
+int array for integer and boolean sockets, so integers are stored exactly.
+Nodes whose inputs are all float sockets or all integer sockets are read and
+written with a single foreach_get / foreach_set on the node's inputs, and
+array valued sockets with foreach_get / foreach_set on their value, straight
+into the packed buffers. Only the remaining scalar sockets, e.g. those of
+nodes with mixed inputs, are read one at a time. On restore only sockets
+whose value differs from the current one are written, so unchanged parts of
+the tree aren't tagged for re-evaluation.
+
+Snapshots are stored as compact byte strings in an ID property group on the
+owning material, node group, texture or scene.
+"""
+import hashlib
+import json
+import struct
+import sys
+import zlib
+from array import array
+
+import bpy
+from .batch import get_path, iter_exposed_sockets
+from .hierarchy import get_hierarchy
+
+SNAPSHOTS_KEY = 'ne_snapshots'
+MAGIC = b'NES1'
+
+# node property types stored in snapshots
+NODE_PROP_TYPES = {'BOOLEAN', 'INT', 'FLOAT', 'ENUM'}
+
+_layouts = {}
+_node_prop_names = {}
+
+
+def get_node_prop_names(node):
+    """Return names of the editable scalar properties a node type adds to Node.
+
+    Args:
+        node (bpy.types.Node): node
+
+    Returns:
+        tuple[str]: property identifiers
+    """
+    names = _node_prop_names.get(node.bl_idname)
+    if names is None:
+        base = {p.identifier for p in bpy.types.Node.bl_rna.properties}
+        names = tuple(
+            p.identifier for p in node.bl_rna.properties
+            if p.identifier not in base
+            and not p.is_readonly
+            and p.type in NODE_PROP_TYPES
+            and not getattr(p, 'is_array', False)
+            and not getattr(p, 'is_enum_flag', False))
+        _node_prop_names[node.bl_idname] = names
+    return names
+
+
+def get_value_kind(value):
+    """Return typecode of the packed array a socket value is stored in.
+
+    Args:
+        value (any): socket default_value
+
+    Returns:
+        str | None: 'f' for floats and float arrays, 'i' for ints and bools,
+            None for values that aren't stored
+    """
+    if isinstance(value, float):
+        return 'f'
+    if isinstance(value, int):
+        return 'i'
+    if hasattr(value, 'foreach_get'):
+        return 'f'
+    return None
+
+
+class SnapshotLayout:
+    """Position of every exposed socket value in the packed arrays.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+        top_level_frame (str): name of top level frame
+    """
+
+    def __init__(self, tree, top_level_frame):
+        # typecode -> [(node inputs, offset, count)] read with one foreach_get
+        self.runs = {'f': [], 'i': []}
+        # typecode -> [(socket, offset)] read one at a time
+        self.scalars = {'f': [], 'i': []}
+        self.arrays = []
+        self.sockets = []
+        self.paths = []
+        self.nodes = get_hierarchy(tree).descendants(top_level_frame)
+        self.sizes = {'f': 0, 'i': 0}
+
+        node_sockets = {}
+        for node, socket in iter_exposed_sockets(tree, top_level_frame):
+            node_sockets.setdefault(node, []).append(socket)
+        for node, sockets in node_sockets.items():
+            values = [socket.default_value for socket in sockets]
+            run_kind = None
+            # bools are left out as foreach_get can't write them to an int buffer
+            if node.type != 'VALUE' and len(sockets) > 1 and len(sockets) == len(node.inputs) \
+                    and len({type(value) for value in values}) == 1 \
+                    and type(values[0]) in (float, int):
+                run_kind = get_value_kind(values[0])
+                self.runs[run_kind].append((node.inputs, self.sizes[run_kind], len(sockets)))
+            for socket, value in zip(sockets, values):
+                kind = get_value_kind(value)
+                if kind is None:
+                    continue
+                offset = self.sizes[kind]
+                if isinstance(value, (bool, int, float)):
+                    length = 0
+                    if run_kind is None:
+                        self.scalars[kind].append((socket, offset))
+                else:
+                    length = len(value)
+                    self.arrays.append((socket, offset, length))
+                self.sockets.append((node, socket, kind, offset, length))
+                self.paths.append((get_path(node, socket), kind, offset, length))
+                self.sizes[kind] += max(length, 1)
+        self.text = '\n'.join(
+            '%s\t%d\t%s' % ('/'.join(path), length, kind)
+            for path, kind, _, length in self.paths)
+        self.key = hashlib.sha1(self.text.encode()).hexdigest()
+
+    def capture(self):
+        """Return current values packed into a float and an int array.
+
+        Returns:
+            dict[str, array]: typecode -> packed values
+        """
+        values = {
+            kind: array(kind, bytes(array(kind).itemsize * size))
+            for kind, size in self.sizes.items()}
+        views = {kind: memoryview(buffer) for kind, buffer in values.items()}
+        for kind, runs in self.runs.items():
+            view = views[kind]
+            for inputs, offset, count in runs:
+                inputs.foreach_get('default_value', view[offset:offset + count])
+        for kind, scalars in self.scalars.items():
+            buffer = values[kind]
+            for socket, offset in scalars:
+                buffer[offset] = socket.default_value
+        view = views['f']
+        for socket, offset, length in self.arrays:
+            socket.default_value.foreach_get(view[offset:offset + length])
+        return values
+
+    def restore(self, values):
+        """Write packed values back to the sockets, skipping unchanged ones.
+
+        Args:
+            values (dict[str, array]): packed values captured with this layout
+
+        Returns:
+            int: number of sockets written
+        """
+        current = self.capture()
+        written = 0
+        for kind, runs in self.runs.items():
+            view = memoryview(values[kind])
+            for inputs, offset, count in runs:
+                old = current[kind][offset:offset + count]
+                new = values[kind][offset:offset + count]
+                if old != new:
+                    inputs.foreach_set('default_value', view[offset:offset + count])
+                    written += sum(1 for a, b in zip(old, new) if a != b)
+        for kind, scalars in self.scalars.items():
+            for socket, offset in scalars:
+                if current[kind][offset] != values[kind][offset]:
+                    socket.default_value = type(socket.default_value)(values[kind][offset])
+                    written += 1
+        view = memoryview(values['f'])
+        for socket, offset, length in self.arrays:
+            if current['f'][offset:offset + length] != values['f'][offset:offset + length]:
+                socket.default_value.foreach_set(view[offset:offset + length])
+                written += 1
+        return written
+
+    def capture_node_props(self):
+        """Return values of the nodes' own scalar properties.
+
+        Returns:
+            dict[str, dict[str, any]]: node name -> property -> value
+        """
+        return {
+            node.name: {name: getattr(node, name) for name in get_node_prop_names(node)}
+            for node in self.nodes if get_node_prop_names(node)}
+
+    def restore_node_props(self, node_props):
+        """Write node property values, skipping unchanged ones.
+
+        Args:
+            node_props (dict[str, dict[str, any]]): node name -> property -> value
+        """
+        for node in self.nodes:
+            props = node_props.get(node.name)
+            if not props:
+                continue
+            for name, value in props.items():
+                try:
+                    if getattr(node, name) != value:
+                        setattr(node, name, value)
+                except (AttributeError, TypeError, ValueError):
+                    pass
+
+
+def get_layout(tree, top_level_frame):
+    """Return layout for tree and frame, cached until the tree's hierarchy changes.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+        top_level_frame (str): name of top level frame
+
+    Returns:
+        SnapshotLayout: layout
+    """
+    version = get_hierarchy(tree).version
+    key = (tree.as_pointer(), top_level_frame)
+    cached = _layouts.get(key)
+    if cached is None or cached[0] != version:
+        cached = (version, SnapshotLayout(tree, top_level_frame))
+        _layouts[key] = cached
+    return cached[1]
+
+
+def clear_layouts():
+    _layouts.clear()
+
+
+def encode_values(values):
+    """Pack float and int arrays into a compressed byte string.
+
+    Args:
+        values (dict[str, array]): typecode -> packed values
+
+    Returns:
+        bytes: blob
+    """
+    floats, ints = values['f'], values['i']
+    if sys.byteorder != 'little':
+        floats, ints = array('f', floats), array('i', ints)
+        floats.byteswap()
+        ints.byteswap()
+    return zlib.compress(
+        MAGIC + struct.pack('<II', len(floats), len(ints)) + floats.tobytes() + ints.tobytes())
+
+
+def decode_values(blob):
+    """Unpack a byte string made by encode_values.
+
+    Args:
+        blob (bytes): blob
+
+    Returns:
+        dict[str, array]: typecode -> packed values
+
+    Raises:
+        ValueError: blob is not a Node Expose snapshot
+    """
+    data = zlib.decompress(blob)
+    floats = array('f')
+    ints = array('i')
+    if data[:4] != MAGIC:
+        raise ValueError("Not a Node Expose snapshot")
+    float_count, int_count = struct.unpack('<II', data[4:12])
+    end = 12 + float_count * 4
+    floats.frombytes(data[12:end])
+    ints.frombytes(data[end:end + int_count * 4])
+    if sys.byteorder != 'little':
+        floats.byteswap()
+        ints.byteswap()
+    return {'f': floats, 'i': ints}
+
+
+def capture(tree, top_level_frame):
+    """Return snapshot of all exposed values below a top level frame.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+        top_level_frame (str): name of top level frame
+
+    Returns:
+        dict: layout key, compressed layout, compressed values and node properties
+    """
+    layout = get_layout(tree, top_level_frame)
+    return {
+        'layout': layout.key,
+        'paths': zlib.compress(layout.text.encode()),
+        'values': encode_values(layout.capture()),
+        'node_props': json.dumps(layout.capture_node_props()),
+    }
+
+
+def restore(tree, top_level_frame, snapshot):
+    """Restore a snapshot made by capture.
+
+    If the tree's layout has changed since the snapshot was taken, values are
+    matched by path instead of by position.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+        top_level_frame (str): name of top level frame
+        snapshot (dict | IDPropertyGroup): snapshot, its byte sections may be
+            bytes or memoryviews
+
+    Returns:
+        int: number of sockets written
+    """
+    layout = get_layout(tree, top_level_frame)
+    values = decode_values(snapshot['values'])
+    if snapshot['layout'] != layout.key:
+        values = remap_values(layout, zlib.decompress(snapshot['paths']).decode(), values)
+    written = layout.restore(values)
+    node_props = snapshot['node_props']
+    if not isinstance(node_props, str):
+        node_props = str(node_props, 'utf-8')
+    layout.restore_node_props(json.loads(node_props))
+    return written
+
+
+def remap_values(layout, paths_text, values):
+    """Rearrange values captured with another layout to match layout.
+
+    Sockets missing from the snapshot keep their current value.
+
+    Args:
+        layout (SnapshotLayout): current layout
+        paths_text (str): SnapshotLayout.text of the layout values were captured with
+        values (dict[str, array]): packed values
+
+    Returns:
+        dict[str, array]: packed values in layout's order
+    """
+    stored = {}
+    offsets = {'f': 0, 'i': 0}
+    for line in paths_text.splitlines():
+        path, length, kind = line.split('\t')
+        length = int(length)
+        stored[path] = (kind, offsets[kind], length)
+        offsets[kind] += max(length, 1)
+
+    remapped = layout.capture()
+    for path, kind, offset, length in layout.paths:
+        match = stored.get('/'.join(path))
+        if match is None or match[2] != length:
+            continue
+        source = values[match[0]]
+        target = remapped[kind]
+        convert = float if kind == 'f' else int
+        for i in range(max(length, 1)):
+            target[offset + i] = convert(source[match[1] + i])
+    return remapped
+
+
+def get_snapshots(owner):
+    """Return snapshot group of an ID, or None if it has none.
+
+    Args:
+        owner (bpy.types.ID): material, node group, texture or scene
+
+    Returns:
+        IDPropertyGroup | None: snapshots by name
+    """
+    return owner.get(SNAPSHOTS_KEY)
+
+
+def store_snapshot(owner, name, snapshot):
+    """Store snapshot on owner under name.
+
+    Args:
+        owner (bpy.types.ID): material, node group, texture or scene
+        name (str): snapshot name
+        snapshot (dict): snapshot made by capture
+    """
+    if SNAPSHOTS_KEY not in owner:
+        owner[SNAPSHOTS_KEY] = {}
+    owner[SNAPSHOTS_KEY][name] = snapshot
+
+
+def get_snapshot_source(context, tree_type):
+    """Return the ID snapshots are stored on, its node tree and top level frame.
+
+    Args:
+        context (bpy.types.Context): context
+        tree_type (str): 'MATERIAL', 'GEOMETRY', 'COMPOSITOR' or 'TEXTURE'
+
+    Returns:
+        tuple[bpy.types.ID, bpy.types.NodeTree, str]: owner, node tree and top level frame name
+
+    Raises:
+        AttributeError, KeyError: there is no such tree
+    """
+    scene = context.scene
+    scene_props = scene.ne_scene_props
+    if tree_type == 'MATERIAL':
+        mat = context.object.active_material
+        return mat, mat.node_tree, scene_props.mat_top_level_frame
+    if tree_type == 'GEOMETRY':
+        tree = context.object.modifiers[scene_props.geom_node_mod].node_group
+        return tree, tree, scene_props.geom_top_level_frame
+    if tree_type == 'COMPOSITOR':
+        return scene, scene.node_tree, scene_props.comp_top_level_frame
+    texture = bpy.data.textures[scene_props.active_texture]
+    return texture, texture.node_tree, scene_props.texture_top_level_frame
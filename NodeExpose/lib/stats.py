@@ -0,0 +1,229 @@
+"""Opt-in timing of panel polls, draws and handlers.
+
+Timing is switched on and off from the addon preferences. While it is off the
+wrappers only check a module level flag before calling through. For every
+timed function a lifetime call count and total are kept along with a rolling
+window of recent call durations, which histograms and percentiles are
+computed from.
+"""
+import csv
+import json
+from collections import deque
+from time import perf_counter
+
+# number of recent calls kept per timed function
+WINDOW = 1000
+
+# upper bounds of histogram buckets in milliseconds
+BUCKETS_MS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 50, 100, float('inf'))
+
+_enabled = False
+_stats = {}
+
+
+class CallStats:
+    """Timings of a single timed function."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=WINDOW)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.recent.append(seconds)
+
+    def mean_ms(self):
+        return self.total / self.count * 1000 if self.count else 0.0
+
+    def percentile_ms(self, percentile):
+        """Return percentile of recent call durations.
+
+        Args:
+            percentile (float): percentile between 0 and 100
+
+        Returns:
+            float: duration in milliseconds
+        """
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index] * 1000
+
+    def histogram(self):
+        """Return number of recent calls falling into each of BUCKETS_MS.
+
+        Returns:
+            list[int]: count per bucket
+        """
+        counts = [0] * len(BUCKETS_MS)
+        for seconds in self.recent:
+            ms = seconds * 1000
+            for i, bound in enumerate(BUCKETS_MS):
+                if ms <= bound:
+                    counts[i] += 1
+                    break
+        return counts
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.mean_ms(),
+            'p50_ms': self.percentile_ms(50),
+            'p95_ms': self.percentile_ms(95),
+            'max_ms': self.max * 1000,
+            'histogram': dict(zip((str(b) for b in BUCKETS_MS), self.histogram())),
+        }
+
+
+def is_enabled():
+    return _enabled
+
+
+def set_enabled(enabled):
+    """Switch timing on or off.
+
+    Args:
+        enabled (bool): enabled
+    """
+    global _enabled
+    _enabled = enabled
+
+
+def add_timing(name, seconds):
+    """Record a call duration.
+
+    Args:
+        name (str): name of timed function
+        seconds (float): duration
+    """
+    stats = _stats.get(name)
+    if stats is None:
+        stats = _stats[name] = CallStats()
+    stats.add(seconds)
+
+
+def get_stats():
+    """Return timings of every timed function that has been called.
+
+    Returns:
+        dict[str, CallStats]: name -> timings
+    """
+    return _stats
+
+
+def reset_stats():
+    _stats.clear()
+
+
+# Wrappers. Blender checks the argument count of registered poll and draw
+# functions so these have explicit signatures rather than *args.
+
+def timed_poll(name, func):
+    """Return poll classmethod function that times func.
+
+    Args:
+        name (str): name to record timings under
+        func (function): undecorated poll function
+
+    Returns:
+        function: wrapped function
+    """
+    def poll(cls, context):
+        if not _enabled:
+            return func(cls, context)
+        start = perf_counter()
+        try:
+            return func(cls, context)
+        finally:
+            add_timing(name, perf_counter() - start)
+    return poll
+
+
+def timed_draw(name, func):
+    """Return draw method that times func.
+
+    Args:
+        name (str): name to record timings under
+        func (function): draw function
+
+    Returns:
+        function: wrapped function
+    """
+    def draw(self, context):
+        if not _enabled:
+            return func(self, context)
+        start = perf_counter()
+        try:
+            return func(self, context)
+        finally:
+            add_timing(name, perf_counter() - start)
+    return draw
+
+
+def timed(name):
+    """Decorator that times a handler or other plain function.
+
+    Args:
+        name (str): name to record timings under
+    """
+    def decorator(func):
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add_timing(name, perf_counter() - start)
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        return wrapper
+    return decorator
+
+
+def instrument_panel(cls):
+    """Wrap poll and draw of a panel class so they can be timed.
+
+    Must be called before the class is registered.
+
+    Args:
+        cls (type[bpy.types.Panel]): panel class
+    """
+    if 'poll' in cls.__dict__:
+        cls.poll = classmethod(timed_poll(
+            cls.__name__ + '.poll', cls.__dict__['poll'].__func__))
+    if 'draw' in cls.__dict__:
+        cls.draw = timed_draw(cls.__name__ + '.draw', cls.__dict__['draw'])
+
+
+def export_json(filepath):
+    """Write timings to a JSON file.
+
+    Args:
+        filepath (str): path of file to write
+    """
+    with open(filepath, 'w') as f:
+        json.dump({name: s.to_dict() for name, s in _stats.items()}, f, indent=2)
+
+
+def export_csv(filepath):
+    """Write timings to a CSV file, one row per timed function.
+
+    Args:
+        filepath (str): path of file to write
+    """
+    fields = ['name', 'count', 'total_ms', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms']
+    with open(filepath, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(fields + ['<=%sms' % b for b in BUCKETS_MS])
+        for name, stats in sorted(_stats.items()):
+            data = stats.to_dict()
+            writer.writerow([name] + [data[k] for k in fields[1:]] + stats.histogram())
@@ -1,6 +1,9 @@
 import os
+from types import SimpleNamespace
 import bpy
 
+_prefs_snapshot = None
+
 # File and directory handling
 
 
@@ -17,3 +20,52 @@ def get_addon_name():
 def get_prefs():
     """returns MakeTile preferences"""
     return bpy.context.preferences.addons[get_addon_name()].preferences
+
+
+def get_prefs_snapshot():
+    """returns cached copy of the addon preferences' values
+
+    Used where preferences are read on every redraw, as get_prefs has to
+    resolve the addon path. The copy is refreshed by update_prefs_snapshot
+    whenever a preference changes.
+    """
+    if _prefs_snapshot is None:
+        update_prefs_snapshot()
+    return _prefs_snapshot
+
+
+def update_prefs_snapshot(prefs=None):
+    """refreshes cached copy of the addon preferences' values"""
+    global _prefs_snapshot
+    if prefs is None:
+        prefs = get_prefs()
+    _prefs_snapshot = SimpleNamespace(**{
+        prop.identifier: getattr(prefs, prop.identifier)
+        for prop in prefs.bl_rna.properties
+        if prop.identifier not in {'rna_type', 'bl_idname'}})
+
+
+def get_preset_directory():
+    """returns directory of the preset library"""
+    directory = get_prefs_snapshot().preset_directory
+    if directory:
+        return bpy.path.abspath(directory)
+    return bpy.utils.user_resource('SCRIPTS', path=os.path.join('presets', 'node_expose'))
+
+
+# Nodes
+
+
+def get_node_label(node):
+    """Return node label if there is one, else return node name.
+
+    Args:
+        node (bpy.types.Node): Node
+
+    Returns:
+        str: Node label
+    """
+    if node.label and not node.label.isspace():
+        return node.label
+    else:
+        return node.name
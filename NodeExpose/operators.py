@@ -0,0 +1,398 @@
+import os
+from bpy.types import Operator
+from bpy.props import EnumProperty, StringProperty, IntProperty, BoolProperty
+from bpy_extras.io_utils import ExportHelper
+from .lib import stats
+from .lib.batch import get_source, get_targets, read_values, write_values, apply_pending
+from .lib.snapshot import (
+    get_snapshot_source,
+    get_snapshots,
+    store_snapshot,
+    capture,
+    restore,
+    get_layout)
+from .lib.presets import get_preset_index, save_preset, apply_preset
+from .lib.utils import get_preset_directory
+from .lib.keyframes import key_exposed
+from .staging import start_staging, stop_staging, apply_staged
+
+TREE_TYPES = [
+    ('MATERIAL', 'Material', "Active material"),
+    ('GEOMETRY', 'Geometry Nodes', "Selected geometry nodes modifier"),
+    ('COMPOSITOR', 'Compositor', "Scene compositor"),
+    ('TEXTURE', 'Texture', "Selected texture")]
+
+# Blender doesn't keep a reference to dynamic enum items
+_snapshot_items = []
+_preset_items = []
+
+
+class NODE_EXPOSE_OT_Export_Stats(Operator, ExportHelper):
+    """Export recorded Node Expose poll, draw and handler timings."""
+    bl_idname = 'node_expose.export_stats'
+    bl_label = 'Export Timings'
+
+    filename_ext = '.json'
+
+    filter_glob: StringProperty(
+        default='*.json;*.csv',
+        options={'HIDDEN'})
+
+    file_format: EnumProperty(
+        name="Format",
+        items=[
+            ('JSON', 'JSON', "Summary and histogram per timed function"),
+            ('CSV', 'CSV', "One row per timed function")],
+        default='JSON')
+
+    def check(self, context):
+        self.filename_ext = '.csv' if self.file_format == 'CSV' else '.json'
+        return super().check(context)
+
+    def execute(self, context):
+        if self.file_format == 'CSV':
+            stats.export_csv(self.filepath)
+        else:
+            stats.export_json(self.filepath)
+        self.report({'INFO'}, "Timings exported to " + os.path.basename(self.filepath))
+        return {'FINISHED'}
+
+
+class NODE_EXPOSE_OT_Reset_Stats(Operator):
+    """Discard recorded Node Expose timings."""
+    bl_idname = 'node_expose.reset_stats'
+    bl_label = 'Reset Timings'
+
+    def execute(self, context):
+        stats.reset_stats()
+        return {'FINISHED'}
+
+
+class NODE_EXPOSE_OT_Change_Page(Operator):
+    """Show the previous or next page of nodes in this frame."""
+    bl_idname = 'node_expose.change_page'
+    bl_label = 'Change Page'
+    bl_options = {'INTERNAL'}
+
+    step: IntProperty(
+        name="Step",
+        default=1)
+
+    @classmethod
+    def poll(cls, context):
+        return getattr(context, 'node', None) is not None
+
+    def execute(self, context):
+        node_props = context.node.ne_node_props
+        node_props.page = max(0, node_props.page + self.step)
+        return {'FINISHED'}
+
+
+class NODE_EXPOSE_OT_Apply_To_Selected(Operator):
+    """Copy exposed values below the top level frame to the matching nodes of all selected objects."""
+    bl_idname = 'node_expose.apply_to_selected'
+    bl_label = 'Apply to Selected'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    tree_type: EnumProperty(
+        name="Tree Type",
+        items=[
+            ('MATERIAL', 'Material', "Active material"),
+            ('GEOMETRY', 'Geometry Nodes', "Selected geometry nodes modifier")],
+        default='MATERIAL')
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and len(context.selected_objects) > 1
+
+    def execute(self, context):
+        try:
+            source, top_level_frame = get_source(context, self.tree_type)
+            values = read_values(source, top_level_frame)
+        except (AttributeError, KeyError):
+            return {'CANCELLED'}
+        if not values:
+            return {'CANCELLED'}
+
+        targets = get_targets(context.selected_objects, source, self.tree_type,
+                              top_level_frame, context.object)
+        written = sum(write_values(tree, values) for tree in targets)
+        self.report({'INFO'}, "Set %d values in %d node trees" % (written, len(targets)))
+        return {'FINISHED'}
+
+
+class NODE_EXPOSE_OT_Apply_Batch_Edits(Operator):
+    """Copy values edited while Edit Selected is on to the objects selected when they were edited."""
+    bl_idname = 'node_expose.apply_batch_edits'
+    bl_label = 'Apply Batch Edits'
+    bl_options = {'INTERNAL', 'UNDO'}
+
+    tree_type: EnumProperty(
+        name="Tree Type",
+        items=[
+            ('MATERIAL', 'Material', "Active material"),
+            ('GEOMETRY', 'Geometry Nodes', "Selected geometry nodes modifier")],
+        default='MATERIAL')
+
+    def execute(self, context):
+        if not apply_pending(self.tree_type):
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+
+def get_snapshot_items(self, context):
+    global _snapshot_items
+    try:
+        owner = get_snapshot_source(context, self.tree_type)[0]
+        snapshots = get_snapshots(owner)
+    except (AttributeError, KeyError):
+        snapshots = None
+    if not snapshots:
+        _snapshot_items = [('%DUMMY', 'None', "")]
+    else:
+        _snapshot_items = [(name, name, "") for name in sorted(snapshots.keys())]
+    return _snapshot_items
+
+
+class NODE_EXPOSE_OT_Capture_Snapshot(Operator):
+    """Store all exposed values below the top level frame as a snapshot."""
+    bl_idname = 'node_expose.capture_snapshot'
+    bl_label = 'Capture Snapshot'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    tree_type: EnumProperty(
+        name="Tree Type",
+        items=TREE_TYPES,
+        default='MATERIAL')
+
+    snapshot_name: StringProperty(
+        name="Name",
+        default="Snapshot")
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        try:
+            owner, tree, top_level_frame = get_snapshot_source(context, self.tree_type)
+            snapshot = capture(tree, top_level_frame)
+        except (AttributeError, KeyError):
+            return {'CANCELLED'}
+        store_snapshot(owner, self.snapshot_name, snapshot)
+        self.report({'INFO'}, "Snapshot '%s' stored on %s" % (self.snapshot_name, owner.name))
+        return {'FINISHED'}
+
+
+class NODE_EXPOSE_OT_Restore_Snapshot(Operator):
+    """Restore exposed values below the top level frame from a snapshot."""
+    bl_idname = 'node_expose.restore_snapshot'
+    bl_label = 'Restore Snapshot'
+    bl_options = {'REGISTER', 'UNDO'}
+    bl_property = 'snapshot'
+
+    tree_type: EnumProperty(
+        name="Tree Type",
+        items=TREE_TYPES,
+        default='MATERIAL')
+
+    snapshot: EnumProperty(
+        name="Snapshot",
+        items=get_snapshot_items)
+
+    def invoke(self, context, event):
+        context.window_manager.invoke_search_popup(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        try:
+            owner, tree, top_level_frame = get_snapshot_source(context, self.tree_type)
+            snapshot = get_snapshots(owner)[self.snapshot]
+        except (AttributeError, KeyError, TypeError):
+            return {'CANCELLED'}
+        try:
+            written = restore(tree, top_level_frame, snapshot)
+        except ValueError as err:
+            self.report({'ERROR'}, str(err))
+            return {'CANCELLED'}
+        self.report({'INFO'}, "Restored %d values" % written)
+        return {'FINISHED'}
+
+
+class NODE_EXPOSE_OT_Delete_Snapshot(Operator):
+    """Delete a snapshot."""
+    bl_idname = 'node_expose.delete_snapshot'
+    bl_label = 'Delete Snapshot'
+    bl_options = {'REGISTER', 'UNDO'}
+    bl_property = 'snapshot'
+
+    tree_type: EnumProperty(
+        name="Tree Type",
+        items=TREE_TYPES,
+        default='MATERIAL')
+
+    snapshot: EnumProperty(
+        name="Snapshot",
+        items=get_snapshot_items)
+
+    def invoke(self, context, event):
+        context.window_manager.invoke_search_popup(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        try:
+            owner = get_snapshot_source(context, self.tree_type)[0]
+            del get_snapshots(owner)[self.snapshot]
+        except (AttributeError, KeyError, TypeError):
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+
+def get_preset_items(self, context):
+    global _preset_items
+    try:
+        tree, top_level_frame = get_snapshot_source(context, self.tree_type)[1:]
+        layout_key = get_layout(tree, top_level_frame).key
+        presets = get_preset_index(get_preset_directory()).presets_for(layout_key)
+    except (AttributeError, KeyError, OSError):
+        presets = []
+    if not presets:
+        _preset_items = [('%DUMMY', 'None', "")]
+    else:
+        _preset_items = [(filename, name, "") for filename, name in presets]
+    return _preset_items
+
+
+class NODE_EXPOSE_OT_Save_Preset(Operator):
+    """Save exposed values below the top level frame to the preset library."""
+    bl_idname = 'node_expose.save_preset'
+    bl_label = 'Save Preset'
+
+    tree_type: EnumProperty(
+        name="Tree Type",
+        items=TREE_TYPES,
+        default='MATERIAL')
+
+    preset_name: StringProperty(
+        name="Name",
+        default="Preset")
+
+    overwrite: BoolProperty(
+        name="Overwrite",
+        description="Replace a preset saved under the same name",
+        default=False,
+        options={'SKIP_SAVE'})
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        try:
+            tree, top_level_frame = get_snapshot_source(context, self.tree_type)[1:]
+            filepath = save_preset(
+                get_preset_directory(), self.preset_name, tree, top_level_frame,
+                overwrite=self.overwrite)
+        except (AttributeError, KeyError):
+            return {'CANCELLED'}
+        except OSError as err:
+            self.report({'ERROR'}, str(err))
+            return {'CANCELLED'}
+        self.report({'INFO'}, "Preset saved to " + filepath)
+        return {'FINISHED'}
+
+
+class NODE_EXPOSE_OT_Apply_Preset(Operator):
+    """Restore exposed values below the top level frame from the preset library.
+    Only presets saved from frames with the same layout are listed"""
+    bl_idname = 'node_expose.apply_preset'
+    bl_label = 'Apply Preset'
+    bl_options = {'REGISTER', 'UNDO'}
+    bl_property = 'preset'
+
+    tree_type: EnumProperty(
+        name="Tree Type",
+        items=TREE_TYPES,
+        default='MATERIAL')
+
+    preset: EnumProperty(
+        name="Preset",
+        items=get_preset_items)
+
+    def invoke(self, context, event):
+        # scan the library once here rather than in the items callback on every redraw
+        get_preset_index(get_preset_directory()).refresh()
+        context.window_manager.invoke_search_popup(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        try:
+            tree, top_level_frame = get_snapshot_source(context, self.tree_type)[1:]
+            written = apply_preset(get_preset_directory(), self.preset, tree, top_level_frame)
+        except (AttributeError, KeyError):
+            return {'CANCELLED'}
+        except (OSError, ValueError) as err:
+            self.report({'ERROR'}, str(err))
+            return {'CANCELLED'}
+        self.report({'INFO'}, "Restored %d values" % written)
+        return {'FINISHED'}
+
+
+class NODE_EXPOSE_OT_Key_Exposed(Operator):
+    """Insert a keyframe on every exposed value below the top level frame at the current frame."""
+    bl_idname = 'node_expose.key_exposed'
+    bl_label = 'Key Exposed Values'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    tree_type: EnumProperty(
+        name="Tree Type",
+        items=TREE_TYPES,
+        default='MATERIAL')
+
+    def execute(self, context):
+        try:
+            tree, top_level_frame = get_snapshot_source(context, self.tree_type)[1:]
+            inserted = key_exposed(tree, top_level_frame, context.scene.frame_current)
+        except (AttributeError, KeyError):
+            return {'CANCELLED'}
+        self.report({'INFO'}, "Inserted %d keyframes" % inserted)
+        return {'FINISHED'}
+
+
+class NODE_EXPOSE_OT_Stage_Edits(Operator):
+    """Edit exposed values below the top level frame without updating the node tree until applied."""
+    bl_idname = 'node_expose.stage_edits'
+    bl_label = 'Stage Edits'
+
+    tree_type: EnumProperty(
+        name="Tree Type",
+        items=TREE_TYPES,
+        default='MATERIAL')
+
+    def execute(self, context):
+        try:
+            tree, top_level_frame = get_snapshot_source(context, self.tree_type)[1:]
+        except (AttributeError, KeyError):
+            return {'CANCELLED'}
+        start_staging(context, tree, top_level_frame)
+        return {'FINISHED'}
+
+
+class NODE_EXPOSE_OT_Apply_Staged(Operator):
+    """Write staged values to the node tree."""
+    bl_idname = 'node_expose.apply_staged'
+    bl_label = 'Apply Staged Edits'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        written = apply_staged(context)
+        self.report({'INFO'}, "Applied %d values" % written)
+        return {'FINISHED'}
+
+
+class NODE_EXPOSE_OT_Discard_Staged(Operator):
+    """Stop staging edits, discarding any that haven't been applied."""
+    bl_idname = 'node_expose.discard_staged'
+    bl_label = 'Discard Staged Edits'
+
+    def execute(self, context):
+        stop_staging(context)
+        return {'FINISHED'}
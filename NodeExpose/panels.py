@@ -1,15 +1,56 @@
 from typing import List
+import functools
 import warnings
 import bpy
 from bpy.app.handlers import persistent
-from bpy.props import PointerProperty, EnumProperty, BoolProperty
+from bpy.props import PointerProperty, EnumProperty, BoolProperty, IntProperty, StringProperty
 from bpy.app.translations import pgettext_iface as iface_
 from bpy.types import (
     Panel,
     PropertyGroup,
     Node)
-from .lib.utils import get_prefs
-import warnings
+from .lib.utils import get_prefs, get_prefs_snapshot, get_node_label
+from .lib.hierarchy import get_hierarchy, invalidate_hierarchy, is_stale, clear_hierarchies
+from .lib.registry import (
+    has_exposed_frames,
+    set_frame_exposed,
+    revalidate_tree,
+    clear_registry,
+    exposed_texture_names,
+    update_texture_tree,
+    texture_index_version,
+    iter_exposing_node_modifiers,
+    exposure_version,
+    object_version,
+    touch_object)
+from .lib.enum_cache import get_enum_items, set_enum_items, clear_enum_cache
+from .lib import stats
+from .lib.handlers import add_handler, add_timer, remove_module, report as handler_report
+from .lib.batch import (
+    get_source,
+    get_targets,
+    take_snapshot,
+    has_snapshot,
+    detect_changes,
+    add_pending,
+    seconds_since_queued,
+    reset_batch)
+from .lib.snapshot import clear_layouts, get_snapshot_source
+from .lib.param_index import clear_parameter_index
+from .spreadsheet import (
+    NODE_EXPOSE_PT_Spreadsheet_Node_N_Panel,
+    NODE_EXPOSE_PT_Spreadsheet_3D_N_Panel)
+from .staging import (
+    VALUE_PROPS,
+    get_staged_value,
+    is_staging,
+    pending_count,
+    reset_staging)
+
+
+NO_FRAME_ENUMS = [('DUMMY', 'None', "")]
+NO_TEXTURE_ENUMS = [('%DUMMY', 'None', "")]
+NO_MODIFIER_ENUMS = [('%DUMMY', 'None', "")]
 
 
 class NODE_EXPOSE_Enum_Helpers:
@@ -29,41 +70,39 @@ class NODE_EXPOSE_Enum_Helpers:
         obj = context.object
         mat = obj.active_material
         tree = mat.node_tree
-        nodes = tree.nodes
 
-        enum_items = self.create_frame_enums(nodes, enum_items)
-        return enum_items
+        return self.create_frame_enums(tree)
 
-    def create_frame_enums(self, nodes, enum_items):
+    def create_frame_enums(self, tree):
         """Return enum list of frame nodes where expose_frame property is set to true.
 
+        The list is cached against the version of the tree's frame hierarchy,
+        so the same list is returned until the tree changes.
+
         Args:
-            nodes (list(bpy.types.Node)): list of nodes
-            enum_items (list(enum_items)): list of enum items
+            tree (bpy.types.NodeTree): node tree
 
         Returns:
-            list(enum_items): emu items
+            list(enum_items): enum items
         """
-        try:
-            frames = sorted([
-                n for n in nodes
-                if n.type == 'FRAME' and n.ne_node_props.expose_frame],
-                key=lambda n: n.label)
-        except KeyError:
+        hierarchy = get_hierarchy(tree)
+        key = ('FRAMES', tree.as_pointer())
+        enum_items = get_enum_items(key, hierarchy.version)
+        if enum_items is not None:
             return enum_items
 
+        frames = hierarchy.exposed_frames
         if not frames:
-            enum = ('DUMMY', 'None', "")
-            enum_items.append(enum)
-            return enum_items
+            return set_enum_items(key, hierarchy.version, NO_FRAME_ENUMS)
 
+        enum_items = []
         for frame in frames:
             label = get_node_label(frame)
 
             enum = (frame.name, label, "")
             enum_items.append(enum)
 
-        return enum_items
+        return set_enum_items(key, hierarchy.version, enum_items)
 
     def get_geom_frame_enums(self, context):
         """Return enum list of active geometry frame nodes that have expose_frame property set to True.
@@ -81,8 +120,7 @@ class NODE_EXPOSE_Enum_Helpers:
             scene_props = context.scene.ne_scene_props
             obj = context.object
             mod = obj.modifiers[scene_props.geom_node_mod]
-            nodes = mod.node_group.nodes
-            return self.create_frame_enums(nodes, enum_items)
+            return self.create_frame_enums(mod.node_group)
         except KeyError:
             return enum_items
 
@@ -101,12 +139,9 @@ class NODE_EXPOSE_Enum_Helpers:
         try:
             scene_props = context.scene.ne_scene_props
             texture = bpy.data.textures[scene_props.active_texture]
-            nodes = texture.node_tree.nodes
-            return self.create_frame_enums(nodes, enum_items)
+            return self.create_frame_enums(texture.node_tree)
         except (KeyError, AttributeError):
-            enum = ('%DUMMY', 'None', '')
-            enum_items.append(enum)
-            return enum_items
+            return NO_TEXTURE_ENUMS
 
     def get_comp_frame_enums(self, context):
         """Return enum list of active compositor frame nodes that have expose_frame property set to True.
@@ -121,9 +156,7 @@ class NODE_EXPOSE_Enum_Helpers:
         if context is None:
             return enum_items
 
-        nodes = context.scene.node_tree.nodes
-        enum_items = self.create_frame_enums(nodes, enum_items)
-        return enum_items
+        return self.create_frame_enums(context.scene.node_tree)
 
 
 class MatPanel:
@@ -139,10 +172,7 @@ class MatPanel:
             bool: True is material contains exposed frames.
         """
         try:
-            for node in context.object.active_material.node_tree.nodes:
-                if node.type == 'FRAME' and node.ne_node_props.expose_frame:
-                    return True
-            return False
+            return has_exposed_frames(context.object.active_material.node_tree)
         except AttributeError:
             return False
 
@@ -152,6 +182,9 @@ class MatPanel:
         layout = self.layout
         if scene_props.mat_top_level_frame:
             layout.prop(scene_props, 'mat_top_level_frame')
+            display_batch_controls(self, context, 'MATERIAL')
+            display_snapshot_controls(self, context, 'MATERIAL')
+            layout.prop(scene_props, 'mat_search', text='', icon='VIEWZOOM')
             layout.separator()
             top_level_frame = scene_props.mat_top_level_frame
 
@@ -160,8 +193,8 @@ class MatPanel:
             tree = mat.node_tree
             nodes = tree.nodes
             try:
-                display_frame(self, context, nodes,
-                              nodes[top_level_frame], top_level_frame)
+                display_exposed(self, context, nodes,
+                                nodes[top_level_frame], scene_props.mat_search)
             except KeyError:
                 pass
 
@@ -175,10 +208,7 @@ class NODE_EXPOSE_PT_Material_3D_N_Panel(Panel, MatPanel):
 
     @classmethod
     def poll(cls, context):
-        prefs = get_prefs()
-        if prefs.expose_mat_nodes_in_3d_n_panel:
-            return cls.mat_has_exposed_nodes(context)
-        return False
+        return cls.mat_has_exposed_nodes(context)
 
     def draw(self, context):
         """Draw panel in 3D view
@@ -198,10 +228,7 @@ class NODE_EXPOSE_PT_Material_Node_N_Panel(Panel, MatPanel):
 
     @classmethod
     def poll(cls, context):
-        prefs = get_prefs()
-        if prefs.expose_mat_nodes_in_node_n_panel:
-            return cls.mat_has_exposed_nodes(context)
-        return False
+        return cls.mat_has_exposed_nodes(context)
 
     def draw(self, context):
         """Draw panel in node editor
@@ -230,10 +257,7 @@ class NODE_EXPOSE_PT_Material_options(Panel, MatPanel):
         Returns:
             bool: bool
         """
-        prefs = get_prefs()
-        if prefs.expose_mat_nodes_in_mat_props:
-            return cls.mat_has_exposed_nodes(context)
-        return False
+        return cls.mat_has_exposed_nodes(context)
 
     def draw(self, context):
         """Draw panel in material properties
@@ -249,13 +273,7 @@ class GeomNodes:
     @classmethod
     def node_mod_has_exposed_nodes(cls, context):
         try:
-            mods = context.object.modifiers
-            for mod in mods:
-                if mod.type == 'NODES':
-                    for node in mod.node_group.nodes:
-                        if node.type == 'FRAME' and node.ne_node_props.expose_frame:
-                            return True
-            return False
+            return any(iter_exposing_node_modifiers(context.object))
         except AttributeError:
             return False
 
@@ -264,9 +282,16 @@ class GeomNodes:
         scene_props = scene.ne_scene_props
         layout = self.layout
 
+        if scene_props.geom_all_modifiers:
+            display_all_node_modifiers(self, context, context.object)
+            return
+
         if scene_props.geom_top_level_frame:
             layout.label(text="Top Level Frame")
             layout.prop(scene_props, 'geom_top_level_frame', text='')
+            display_batch_controls(self, context, 'GEOMETRY')
+            display_snapshot_controls(self, context, 'GEOMETRY')
+            layout.prop(scene_props, 'geom_search', text='', icon='VIEWZOOM')
             layout.separator()
             top_level_frame = scene_props.geom_top_level_frame
 
@@ -274,8 +299,8 @@ class GeomNodes:
             mod = obj.modifiers[scene_props.geom_node_mod]
             nodes = mod.node_group.nodes
             try:
-                display_frame(self, context, nodes,
-                              nodes[top_level_frame], top_level_frame)
+                display_exposed(self, context, nodes,
+                                nodes[top_level_frame], scene_props.geom_search)
             except KeyError:
                 pass
 
@@ -289,12 +314,10 @@ class NODE_EXPOSE_PT_Geometry_Nodes_N_Panel(Panel, GeomNodes):
 
     @classmethod
     def poll(cls, context):
-        prefs = get_prefs()
-        if prefs.expose_geom_nodes_in_node_n_panel:
-            return cls.node_mod_has_exposed_nodes(context)
-        return False
+        return cls.node_mod_has_exposed_nodes(context)
 
     def draw(self, context):
+        self.layout.prop(context.scene.ne_scene_props, 'geom_all_modifiers')
         self.draw_geom_nodes_panel(context)
 
 
@@ -307,15 +330,15 @@ class NODE_EXPOSE_PT_Geometry_View_3D_N_Panel(Panel, GeomNodes):
 
     @classmethod
     def poll(cls, context):
-        prefs = get_prefs()
-        if prefs.expose_geom_nodes_in_3d_n_panel:
-            return cls.node_mod_has_exposed_nodes(context)
-        return False
+        return cls.node_mod_has_exposed_nodes(context)
 
     def draw(self, context):
         layout = self.layout
-        layout.label(text="Node Modifier")
-        layout.prop(context.scene.ne_scene_props, 'geom_node_mod', text='')
+        scene_props = context.scene.ne_scene_props
+        layout.prop(scene_props, 'geom_all_modifiers')
+        if not scene_props.geom_all_modifiers:
+            layout.label(text="Node Modifier")
+            layout.prop(scene_props, 'geom_node_mod', text='')
         self.draw_geom_nodes_panel(context)
 
 
@@ -323,10 +346,7 @@ class CompositorNodes(NODE_EXPOSE_Enum_Helpers):
     @classmethod
     def comp_has_exposed_nodes(cls, context):
         try:
-            for node in context.scene.node_tree.nodes:
-                if node.type == 'FRAME' and node.ne_node_props.expose_frame:
-                    return True
-            return False
+            return has_exposed_frames(context.scene.node_tree)
         except AttributeError:
             return False
 
@@ -338,13 +358,15 @@ class CompositorNodes(NODE_EXPOSE_Enum_Helpers):
         if scene_props.comp_top_level_frame:
             layout.label(text="Top Level Frame")
             layout.prop(scene_props, 'comp_top_level_frame', text='')
+            display_snapshot_controls(self, context, 'COMPOSITOR')
+            layout.prop(scene_props, 'comp_search', text='', icon='VIEWZOOM')
             layout.separator()
             top_level_frame = scene_props.comp_top_level_frame
 
             comp_nodes = scene.node_tree.nodes
             try:
-                display_frame(self, context, comp_nodes,
-                              comp_nodes[top_level_frame], top_level_frame)
+                display_exposed(self, context, comp_nodes,
+                                comp_nodes[top_level_frame], scene_props.comp_search)
             except KeyError:
                 pass
 
@@ -358,10 +380,7 @@ class NODE_EXPOSE_PT_Compositor_View_3D_N_Panel(Panel, CompositorNodes):
 
     @classmethod
     def poll(cls, context):
-        prefs = get_prefs()
-        if prefs.expose_comp_nodes_in_3d_n_panel:
-            return cls.comp_has_exposed_nodes(context)
-        return False
+        return cls.comp_has_exposed_nodes(context)
 
     def draw(self, context):
         self.draw_comp_nodes_panel(context)
@@ -376,10 +395,7 @@ class NODE_EXPOSE_PT_Compositor_Nodes_N_Panel(Panel, CompositorNodes):
 
     @classmethod
     def poll(cls, context):
-        prefs = get_prefs()
-        if prefs.expose_comp_nodes_in_node_n_panel:
-            return cls.comp_has_exposed_nodes(context)
-        return False
+        return cls.comp_has_exposed_nodes(context)
 
     def draw(self, context):
         self.draw_comp_nodes_panel(context)
@@ -388,15 +404,7 @@ class NODE_EXPOSE_PT_Compositor_Nodes_N_Panel(Panel, CompositorNodes):
 class TextureNodes:
     @classmethod
     def texture_has_exposed_nodes(cls, context):
-        try:
-            textures = bpy.data.textures
-            for texture in textures:
-                for node in texture.node_tree.nodes:
-                    if node.type == 'FRAME' and node.ne_node_props.expose_frame:
-                        return True
-            return False
-        except AttributeError:
-            return False
+        return bool(exposed_texture_names())
 
     def draw_texture_nodes_panel(self, context):
         scene = context.scene
@@ -409,14 +417,16 @@ class TextureNodes:
         if scene_props.active_texture and scene_props.texture_top_level_frame:
             layout.label(text="Top Level Frame")
             layout.prop(scene_props, 'texture_top_level_frame', text='')
+            display_snapshot_controls(self, context, 'TEXTURE')
+            layout.prop(scene_props, 'texture_search', text='', icon='VIEWZOOM')
             layout.separator()
 
             top_level_frame = scene_props.texture_top_level_frame
             try:
                 nodes = bpy.data.textures[scene_props.active_texture].node_tree.nodes
 
-                display_frame(self, context, nodes,
-                              nodes[top_level_frame], top_level_frame)
+                display_exposed(self, context, nodes,
+                                nodes[top_level_frame], scene_props.texture_search)
             except (KeyError, AttributeError):
                 pass
 
@@ -430,10 +440,7 @@ class NODE_EXPOSE_PT_Texture_Nodes_N_Panel(Panel, TextureNodes):
 
     @classmethod
     def poll(cls, context):
-        prefs = get_prefs()
-        if prefs.expose_texture_nodes_in_node_n_panel:
-            return cls.texture_has_exposed_nodes(context)
-        return False
+        return cls.texture_has_exposed_nodes(context)
 
     def draw(self, context):
         self.draw_texture_nodes_panel(context)
@@ -448,152 +455,284 @@ class NODE_EXPOSE_PT_Texture_View_3D_N_Panel(Panel, TextureNodes):
 
     @classmethod
     def poll(cls, context):
-        prefs = get_prefs()
-        if prefs.expose_texture_nodes_in_node_n_panel:
-            return cls.texture_has_exposed_nodes(context)
-        return False
+        return cls.texture_has_exposed_nodes(context)
 
     def draw(self, context):
         self.draw_texture_nodes_panel(context)
 
 
-def display_frame(self, context, nodes, frame, top_level_frame=None) -> None:
+def display_frame(self, context, nodes, frame, top_level_frame=None, depths=None, limits=None) -> None:
     """Recursively display all nodes within a frame, including nodes contained in sub frames.
 
     Args:
         context (bpy.types.Context): blender context
-        nodes (list[Node]): nodes to search within
+        nodes (bpy.types.Nodes): nodes to search within
         frame (bpy.types.NodeFrame): parent node frame.
-        top_level_frame(bpy.types.NodeFrame): grandparent frame to stop at
+        top_level_frame(str): name of grandparent frame to stop at
+        depths (dict[str, int], optional): depth of nodes below top_level_frame.
+            Looked up from the frame hierarchy if not passed.
+        limits (DrawLimits, optional): paging and expanded node limits for this redraw.
+            Read from preferences if not passed.
     """
-    children = sorted([n for n in nodes if n.parent ==
-                       frame and n.type != 'FRAME'],
-                      key=lambda x: x.label)
-
-    frames = sorted([n for n in nodes if n.parent ==
-                    frame and n.type == 'FRAME'],
-                    key=lambda x: x.label)
-
-    if not frames and children:
-        display_framed_nodes(self, context, children, top_level_frame)
-        return
-
-    subpanel_status = frame.ne_node_props.subpanel_status
+    hierarchy = get_hierarchy(nodes.id_data)
+    if depths is None:
+        depths = hierarchy.depths(top_level_frame or frame.name)
+    if limits is None:
+        limits = DrawLimits.from_prefs()
+    children = hierarchy.child_nodes(frame)
+    frames = hierarchy.child_frames(frame)
 
     if children:
-        children = [n for n in children if n.type != 'FRAME']
-        display_framed_nodes(self, context, children, top_level_frame)
+        display_framed_nodes(self, context, children, depths, frame, limits)
 
     # handles nested frames
     for f in frames:
-        if [n for n in nodes if n.parent == f]:
+        if hierarchy.has_children(f):
             subpanel_status = f.ne_node_props.subpanel_status
             display_subpanel_label(
-                self, subpanel_status,  f, top_level_frame)
+                self, subpanel_status, f, depths.get(f.name, 0))
             if subpanel_status:
-                display_frame(self, context,  nodes,
-                              f, top_level_frame)
+                display_frame(self, context, nodes,
+                              f, top_level_frame, depths, limits)
 
     return
 
 
-def display_subpanel_label(self, subpanel_status: bool, node: Node, top_level_frame=None) -> None:
+def display_batch_controls(self, context, tree_type) -> None:
+    """Display batch edit toggle and apply button when several objects are selected.
+
+    Args:
+        context (bpy.types.Context): blender context
+        tree_type (str): 'MATERIAL' or 'GEOMETRY'
+    """
+    if len(context.selected_objects) < 2:
+        return
+    row = self.layout.row(align=True)
+    row.prop(context.scene.ne_scene_props, 'batch_edit', toggle=True)
+    op = row.operator('node_expose.apply_to_selected')
+    op.tree_type = tree_type
+
+
+def display_snapshot_controls(self, context, tree_type) -> None:
+    """Display buttons for snapshots, presets and keyframes of the exposed values.
+
+    Args:
+        context (bpy.types.Context): blender context
+        tree_type (str): 'MATERIAL', 'GEOMETRY', 'COMPOSITOR' or 'TEXTURE'
+    """
+    row = self.layout.row(align=True)
+    row.operator('node_expose.capture_snapshot', text='Snapshot', icon='FILE_TICK').tree_type = tree_type
+    row.operator('node_expose.restore_snapshot', text='Restore', icon='RECOVER_LAST').tree_type = tree_type
+    row.operator('node_expose.delete_snapshot', text='', icon='X').tree_type = tree_type
+    row.operator('node_expose.key_exposed', text='', icon='KEY_HLT').tree_type = tree_type
+    row = self.layout.row(align=True)
+    row.operator('node_expose.apply_preset', text='Presets', icon='PRESET').tree_type = tree_type
+    row.operator('node_expose.save_preset', text='', icon='ADD').tree_type = tree_type
+    display_staging_controls(self, context, tree_type)
+
+
+def display_staging_controls(self, context, tree_type) -> None:
+    """Display button to stage edits, or to apply or discard them while staging.
+
+    Args:
+        context (bpy.types.Context): blender context
+        tree_type (str): 'MATERIAL', 'GEOMETRY', 'COMPOSITOR' or 'TEXTURE'
+    """
+    try:
+        tree, top_level_frame = get_snapshot_source(context, tree_type)[1:]
+    except (AttributeError, KeyError):
+        return
+    row = self.layout.row(align=True)
+    if not is_staging(tree, top_level_frame):
+        row.operator('node_expose.stage_edits', icon='PAUSE').tree_type = tree_type
+        return
+    pending = pending_count(context)
+    row.alert = bool(pending)
+    row.operator('node_expose.apply_staged', text="Apply %d Pending" % pending, icon='CHECKMARK')
+    row.operator('node_expose.discard_staged', text='', icon='X')
+
+
+def display_exposed(self, context, nodes, top_level_frame, search="") -> None:
+    """Display the nodes below a top level frame, or only those matching search.
+
+    Args:
+        context (bpy.types.Context): blender context
+        nodes (bpy.types.Nodes): nodes to search within
+        top_level_frame (bpy.types.NodeFrame): exposed top level frame
+        search (str): filter text, nodes are displayed as a flat list if set
+    """
+    if search and not search.isspace():
+        display_search_results(self, context, nodes, top_level_frame, search)
+    else:
+        display_frame(self, context, nodes,
+                      top_level_frame, top_level_frame.name)
+
+
+def display_search_results(self, context, nodes, top_level_frame, search) -> None:
+    """Display nodes below a top level frame whose label, name or input sockets match search.
+
+    Args:
+        context (bpy.types.Context): blender context
+        nodes (bpy.types.Nodes): nodes to search within
+        top_level_frame (bpy.types.NodeFrame): exposed top level frame
+        search (str): filter text
+    """
+    layout = self.layout
+    hierarchy = get_hierarchy(nodes.id_data)
+    matches = hierarchy.search_index(top_level_frame.name).search(search)
+    if not matches:
+        layout.label(text="No matches")
+        return
+
+    limits = DrawLimits.from_prefs()
+    for node, sockets in matches[:limits.rows_per_page]:
+        node_label = get_node_label(node)
+        try:
+            display_node(self, context, node_label, node, 0, limits, sockets)
+        except TypeError:
+            layout.label(text=node_label)
+            layout.label(text="Node type not supported.")
+    if len(matches) > limits.rows_per_page:
+        layout.label(text="%d more matches" % (len(matches) - limits.rows_per_page))
+
+
+class DrawLimits:
+    """Limits on how much a single redraw of a panel draws.
+
+    Args:
+        rows_per_page (int): max child nodes of a frame to draw before paging
+        max_expanded_nodes (int): max expanded nodes to draw in full
+    """
+
+    def __init__(self, rows_per_page, max_expanded_nodes):
+        self.rows_per_page = rows_per_page
+        self.max_expanded_nodes = max_expanded_nodes
+        self.expanded_nodes = 0
+
+    @classmethod
+    def from_prefs(cls):
+        prefs = get_prefs_snapshot()
+        return cls(prefs.rows_per_page, prefs.max_expanded_nodes)
+
+
+def display_subpanel_label(self, subpanel_status: bool, node: Node, depth=0, summary=None) -> None:
     """Display a label with a dropdown control for showing and hiding a subpanel.
 
     Args:
         subpanel_status (Bool): Controls arrow state
-        f (bpy.types.Node): Node
+        node (bpy.types.Node): Node
+        depth (int): depth of node below top level frame
+        summary (str, optional): text shown after the label
     """
     layout = self.layout
     icon = 'DOWNARROW_HLT' if subpanel_status else 'RIGHTARROW'
     node_label = get_node_label(node)
     row = layout.row()
     row.alignment = 'LEFT'
-    if num_ancestors(node, top_level_frame):
-        inset = " " * num_ancestors(node)
+    if depth:
+        inset = " " * depth
         row.label(text=inset)
     row.prop(node.ne_node_props, 'subpanel_status', icon=icon,
              icon_only=True, emboss=False)
     row.label(text=node_label)
+    if summary:
+        row.label(text=summary)
 
 
-def get_node_label(node):
-    """Return node label if there is one, else return node name.
+def get_node_summary(node):
+    """Return a cheap one line summary of a collapsed node.
 
     Args:
         node (bpy.types.Node): Node
 
     Returns:
-        str: Node label
+        str: summary
     """
-    if node.label and not node.label.isspace():
-        return node.label
-    else:
-        return node.name
+    num_inputs = len(node.inputs)
+    return "%s, %d input%s" % (node.bl_label, num_inputs, "" if num_inputs == 1 else "s")
 
 
-def num_ancestors(node, top_level_frame=None, ancestors=0):
-    """Return number of ancestor of a node.
+def display_page_controls(self, frame, page, num_pages) -> None:
+    """Display previous / next page buttons for the child nodes of a frame.
 
     Args:
-        node (bpy.types.Node): node
-        ancestors (int, optional): Num ancestors. Defaults to 0.
-
-    Returns:
-        int: num ancestors
+        frame (bpy.types.NodeFrame): frame being paged
+        page (int): current page
+        num_pages (int): number of pages
     """
-    if not node.parent:
-        return ancestors
-    elif node.parent.name == top_level_frame:
-        return 0
-    if node.parent:
-        ancestors = num_ancestors(node.parent, top_level_frame, ancestors) + 1
-    return ancestors
-
-
-def display_framed_nodes(self, context, children: List[Node], top_level_frame=None) -> None:
-    """Display all nodes in a frame.
+    row = self.layout.row(align=True)
+    row.context_pointer_set("node", frame)
+    sub = row.row(align=True)
+    sub.enabled = page > 0
+    op = sub.operator('node_expose.change_page', text="", icon='TRIA_LEFT')
+    op.step = -1
+    row.label(text="Page %d / %d" % (page + 1, num_pages))
+    sub = row.row(align=True)
+    sub.enabled = page < num_pages - 1
+    op = sub.operator('node_expose.change_page', text="", icon='TRIA_RIGHT')
+    op.step = 1
+
+
+def display_framed_nodes(self, context, children: List[Node], depths=None, frame=None, limits=None) -> None:
+    """Display all nodes in a frame, a page at a time if there are too many.
 
     Args:
         context (bpy.types.Context): context
         children (list): List of child nodes
+        depths (dict[str, int], optional): depth of nodes below top level frame
+        frame (bpy.types.NodeFrame, optional): frame containing children, needed for paging
+        limits (DrawLimits, optional): paging and expanded node limits
     """
 
     layout = self.layout
+    if depths is None:
+        depths = {}
+
+    if frame is not None and limits is not None and len(children) > limits.rows_per_page:
+        rows_per_page = limits.rows_per_page
+        num_pages = -(-len(children) // rows_per_page)
+        page = min(frame.ne_node_props.page, num_pages - 1)
+        display_page_controls(self, frame, page, num_pages)
+        children = children[page * rows_per_page:(page + 1) * rows_per_page]
 
     for child in children:
         child_label = get_node_label(child)
         try:
-            display_node(self, context, child_label, child, top_level_frame)
+            display_node(self, context, child_label, child,
+                         depths.get(child.name, 0), limits)
         # catch unsupported node types
         except TypeError:
             layout.label(text=child_label)
             layout.label(text="Node type not supported.")
 
 
-def split_col(node, top_level_frame):
-    """Calculate how many times to split a panel column based on number of ancestors for drawing drop down.
+def split_col(depth):
+    """Calculate how many times to split a panel column based on depth for drawing drop down.
 
     Args:
-        node (bpy.types.Node): node
-        top_level_frame (_type_): grandparent frame
+        depth (int): depth of node below top level frame
 
     Returns:
         int: num times to split column
     """
-    if num_ancestors(node, top_level_frame) == 0:
-        return 1
-    else:
-        return num_ancestors(node, top_level_frame)
+    return depth or 1
 
 
-def display_node(self, context, node_label, node, top_level_frame=None) -> None:
+def display_node(self, context, node_label, node, depth=0, limits=None, sockets=None) -> None:
     """Display node properties in panel.
 
+    Collapsed nodes are shown as a one line summary. Once limits.max_expanded_nodes
+    expanded nodes have been drawn in this redraw further expanded nodes are
+    also summarised.
+
     Args:
         context (bpy.types.Context): context
         node_label (str): node_label
         node (bpy.types.Node): Node to display.
+        depth (int): depth of node below top level frame
+        limits (DrawLimits, optional): expanded node limit for this redraw
+        sockets (list[bpy.types.NodeSocket], optional): input sockets to draw.
+            Defaults to all inputs.
     """
     if node.type in ('REROUTE', 'FRAME'):
         return
@@ -604,38 +743,139 @@ def display_node(self, context, node_label, node, top_level_frame=None) -> None:
 
     if node.type == 'VALUE':
         row = layout.row()
-        ancestors = num_ancestors(node, top_level_frame)
 
-        if ancestors >= 1:
-            row = row.split(factor=0.1 * split_col(node, top_level_frame))
-            inset = " " * ancestors
+        if depth >= 1:
+            row = row.split(factor=0.1 * split_col(depth))
+            inset = " " * depth
             row.label(text=inset)
-        row.prop(node.outputs['Value'], 'default_value', text=node_label)
+        socket = node.outputs['Value']
+        staged, pending = get_staged_value(context, socket)
+        if staged is None:
+            row.prop(socket, 'default_value', text=node_label)
+        else:
+            draw_staged_value(row, staged, pending, node_label)
     else:
         subpanel_status = node.ne_node_props.subpanel_status
-        display_subpanel_label(self, subpanel_status, node, top_level_frame)
+        if subpanel_status and limits is not None:
+            if limits.expanded_nodes >= limits.max_expanded_nodes:
+                display_subpanel_label(
+                    self, subpanel_status, node, depth,
+                    get_node_summary(node) + " (not drawn, too many expanded nodes)")
+                return
+            limits.expanded_nodes += 1
+        summary = None if subpanel_status else get_node_summary(node)
+        display_subpanel_label(self, subpanel_status, node, depth, summary)
         if subpanel_status:
             layout.context_pointer_set("node", node)
-            if hasattr(node, "draw_buttons_ext"):
-                node.draw_buttons_ext(context, layout)
-            elif hasattr(node, "draw_buttons"):
-                node.draw_buttons(context, layout)
+            draw_node_buttons(context, layout, node)
 
             value_inputs = [
-                socket for socket in node.inputs]
+                socket for socket in node.inputs] if sockets is None else sockets
             if value_inputs:
                 row = layout.row()
                 row.label(text="Inputs:")
 
                 for socket in value_inputs:
                     row = layout.row()
-                    socket.draw(
-                        context,
-                        row,
-                        node,
-                        iface_(socket.label if socket.label else socket.name,
-                               socket.bl_rna.translation_context),
-                    )
+                    draw_socket(context, row, node, socket)
+
+            if node.type == 'GROUP' and node.node_tree and sockets is None:
+                display_node_group(self, context, node.node_tree, depth, limits)
+
+
+def display_all_node_modifiers(self, context, obj) -> None:
+    """Display the exposed frames of every geometry nodes modifier of an object.
+
+    Modifiers sharing a node group are shown together, as editing one edits
+    them all.
+
+    Args:
+        context (bpy.types.Context): context
+        obj (bpy.types.Object): object
+    """
+    groups = {}
+    for mod in iter_exposing_node_modifiers(obj):
+        groups.setdefault(mod.node_group.as_pointer(), (mod.node_group, []))[1].append(mod.name)
+    limits = DrawLimits.from_prefs()
+    for tree, mod_names in groups.values():
+        self.layout.label(text=", ".join(mod_names), icon='GEOMETRY_NODES')
+        display_node_group(self, context, tree, 0, limits)
+
+
+def display_node_group(self, context, tree, depth=0, limits=None) -> None:
+    """Display the exposed frames inside a node group.
+
+    The group's frame hierarchy is cached per node group datablock, so a group
+    used in many trees is only analysed once.
+
+    Args:
+        context (bpy.types.Context): context
+        tree (bpy.types.NodeTree): node group
+        depth (int): depth of the group node below top level frame
+        limits (DrawLimits, optional): paging and expanded node limits
+    """
+    hierarchy = get_hierarchy(tree)
+    for frame in hierarchy.root_exposed_frames():
+        if not hierarchy.has_children(frame):
+            continue
+        subpanel_status = frame.ne_node_props.subpanel_status
+        display_subpanel_label(self, subpanel_status, frame, depth + 1)
+        if subpanel_status:
+            display_frame(self, context, tree.nodes, frame, frame.name,
+                          hierarchy.depths(frame.name, depth + 2), limits)
+
+
+def draw_node_buttons(context, layout, node) -> None:
+    """Draw a node's own buttons, as shown in the node editor sidebar.
+
+    Args:
+        context (bpy.types.Context): context
+        layout (bpy.types.UILayout): layout to draw into
+        node (bpy.types.Node): node
+    """
+    if hasattr(node, "draw_buttons_ext"):
+        node.draw_buttons_ext(context, layout)
+    elif hasattr(node, "draw_buttons"):
+        node.draw_buttons(context, layout)
+
+
+def draw_socket(context, layout, node, socket) -> None:
+    """Draw an input socket's value.
+
+    Args:
+        context (bpy.types.Context): context
+        layout (bpy.types.UILayout): layout to draw into
+        node (bpy.types.Node): node owning socket
+        socket (bpy.types.NodeSocket): socket to draw
+    """
+    staged, pending = get_staged_value(context, socket)
+    if staged is not None:
+        draw_staged_value(
+            layout, staged, pending,
+            iface_(socket.label if socket.label else socket.name,
+                   socket.bl_rna.translation_context))
+        return
+    socket.draw(
+        context,
+        layout,
+        node,
+        iface_(socket.label if socket.label else socket.name,
+               socket.bl_rna.translation_context),
+    )
+
+
+def draw_staged_value(layout, staged, pending, text) -> None:
+    """Draw staged copy of a socket's value, highlighted if it hasn't been applied.
+
+    Args:
+        layout (bpy.types.UILayout): layout to draw into
+        staged (NODE_EXPOSE_Staged_Value): staged value
+        pending (bool): staged value differs from the socket's value
+        text (str): label
+    """
+    row = layout.row()
+    row.alert = pending
+    row.prop(staged, VALUE_PROPS[staged.kind], text=text)
 
 
 class NODE_EXPOSE_PT_Node_Options(Panel):
@@ -668,7 +908,11 @@ class NODE_EXPOSE_Node_Props(PropertyGroup, NODE_EXPOSE_Enum_Helpers):
     """
 
     def update_frame_enums(self, context):
+        set_frame_exposed(self)
+        invalidate_hierarchy(self.id_data)
         tree_type = type(self.id_data)
+        if tree_type == bpy.types.TextureNodeTree:
+            update_texture_tree(self.id_data)
         if tree_type == bpy.types.CompositorNodeTree:
             comp_enums = self.get_comp_frame_enums(context)
             if comp_enums:
@@ -686,15 +930,25 @@ class NODE_EXPOSE_Node_Props(PropertyGroup, NODE_EXPOSE_Enum_Helpers):
             if texture_enums:
                 context.scene.ne_scene_props.texture_top_level_frame = texture_enums[0][0]
 
+    def update_exclude_node(self, context):
+        invalidate_hierarchy(self.id_data)
+
     exclude_node: BoolProperty(
         name="Exclude Node",
         description="Don't show this node in UI.",
-        default=False)
+        default=False,
+        update=update_exclude_node)
 
     subpanel_status: BoolProperty(
         name="Show Subpanel",
         default=True)
 
+    page: IntProperty(
+        name="Page",
+        description="Page of child nodes shown when a frame has more nodes than fit on a page",
+        default=0,
+        min=0)
+
     expose_frame: BoolProperty(
         name="Expose Frame",
         description="Expose frame and nodes?",
@@ -736,23 +990,24 @@ class NODE_EXPOSE_Scene_Props(PropertyGroup, NODE_EXPOSE_Enum_Helpers):
             return enum_items
 
         obj = context.object
-        mods = sorted([m for m in obj.modifiers if m.type ==
-                      'NODES'], key=lambda m: m.name)
-        for mod in mods:
-            nodes = mod.node_group.nodes
-            frames = [f for f in nodes if f.type ==
-                      'FRAME' and f.ne_node_props.expose_frame]
-            if frames:
-                enum = (mod.name, mod.name, "")
-                enum_items.append(enum)
-        if not enum_items:
-            enum = ('%DUMMY', "None", "")
-            enum_items.append(enum)
+        # the items only change when a tree gains or loses exposed frames or
+        # the object's modifiers change, which update_enums records, so the
+        # modifiers are only walked again after one of those.
+        version = (exposure_version(), object_version(obj))
+        key = ('NODE_MODS', obj.as_pointer())
+        enum_items = get_enum_items(key, version)
+        if enum_items is not None:
+            return enum_items
 
-        return enum_items
+        mod_names = sorted(m.name for m in iter_exposing_node_modifiers(obj))
+        if not mod_names:
+            return set_enum_items(key, version, NO_MODIFIER_ENUMS)
+
+        enum_items = [(name, name, "") for name in mod_names]
+        return set_enum_items(key, version, enum_items)
 
     def create_texture_enums(self, context):
-        """Return enum list of textures.
+        """Return enum list of node based textures that contain exposed frames.
 
         Args:
             context (bpy.types.Context): context
@@ -764,16 +1019,18 @@ class NODE_EXPOSE_Scene_Props(PropertyGroup, NODE_EXPOSE_Enum_Helpers):
         if context is None:
             return enum_items
 
-        textures = bpy.data.textures
+        key = ('TEXTURES',)
+        version = texture_index_version()
+        enum_items = get_enum_items(key, version)
+        if enum_items is not None:
+            return enum_items
+
+        names = exposed_texture_names()
+        if not names:
+            return set_enum_items(key, version, NO_TEXTURE_ENUMS)
 
-        for texture in textures:
-            if hasattr(texture.node_tree, 'nodes'):
-                enum = (texture.name, texture.name, "")
-                enum_items.append(enum)
-        if not enum_items:
-            enum = ('%DUMMY', "None", "")
-            enum_items.append(enum)
-        return enum_items
+        enum_items = [(name, name, "") for name in names]
+        return set_enum_items(key, version, enum_items)
 
     mat_top_level_frame: EnumProperty(
         name="Frame",
@@ -804,94 +1061,408 @@ class NODE_EXPOSE_Scene_Props(PropertyGroup, NODE_EXPOSE_Enum_Helpers):
         description="Geometry node modifier to expose."
     )
 
+    geom_all_modifiers: BoolProperty(
+        name="All Modifiers",
+        description="Show the exposed frames of every geometry nodes modifier of the active object",
+        default=False
+    )
+
     active_texture: EnumProperty(
         name="Texture",
         items=create_texture_enums,
         description="Textures"
     )
 
+    def update_batch_edit(self, context):
+        reset_batch()
+        if self.batch_edit:
+            snapshot_batch_sources(context)
+
+    batch_edit: BoolProperty(
+        name="Edit Selected",
+        description="Apply changes to exposed values to the matching nodes "
+        "of every selected object's material or geometry nodes modifier",
+        default=False,
+        update=update_batch_edit)
+
+    mat_search: StringProperty(
+        name="Search",
+        description="Only show nodes and inputs whose label or name contains this text",
+        options={'TEXTEDIT_UPDATE'})
+
+    geom_search: StringProperty(
+        name="Search",
+        description="Only show nodes and inputs whose label or name contains this text",
+        options={'TEXTEDIT_UPDATE'})
+
+    comp_search: StringProperty(
+        name="Search",
+        description="Only show nodes and inputs whose label or name contains this text",
+        options={'TEXTEDIT_UPDATE'})
+
+    texture_search: StringProperty(
+        name="Search",
+        description="Only show nodes and inputs whose label or name contains this text",
+        options={'TEXTEDIT_UPDATE'})
+
+
+def validate_top_level_frame(scene_props, prop_name, tree):
+    """Reset a top level frame enum if it no longer points at an exposed frame.
+
+    Args:
+        scene_props (NODE_EXPOSE_Scene_Props): scene properties
+        prop_name (str): name of top level frame enum property
+        tree (bpy.types.NodeTree): node tree the enum refers to
+    """
+    hierarchy = get_hierarchy(tree)
+    if hierarchy.exposed_frames:
+        if getattr(scene_props, prop_name) not in hierarchy.exposed_names:
+            setattr(scene_props, prop_name, hierarchy.exposed_frames[0].name)
+
+
+def validate_geom_node_mod(scene_props, obj):
+    """Reset geom_node_mod if it no longer points at a modifier with exposed frames.
+
+    Args:
+        scene_props (NODE_EXPOSE_Scene_Props): scene properties
+        obj (bpy.types.Object): active object
+    """
+    mods = sorted(m.name for m in iter_exposing_node_modifiers(obj))
+    if mods and scene_props.geom_node_mod not in mods:
+        scene_props.geom_node_mod = mods[0]
+
+
+_last_owners = None
+
+
+def get_updated_tree(id_data):
+    """Return node tree an updated ID owns or is.
+
+    Scenes are left out. Almost any scene property change, e.g. typing in a
+    search field, updates the scene, so update_enums only checks a
+    compositor tree's structure rather than treating it as updated.
+
+    Args:
+        id_data (bpy.types.ID): original ID from a depsgraph update
+
+    Returns:
+        bpy.types.NodeTree | None: node tree
+    """
+    if isinstance(id_data, bpy.types.NodeTree):
+        return id_data
+    if isinstance(id_data, bpy.types.Scene):
+        return None
+    return getattr(id_data, 'node_tree', None)
+
+
+def structure_changed(tree):
+    """Discard caches of tree if nodes were added, deleted, renamed or re-parented.
+
+    Only node and parent names and the recorded exposed frames are compared,
+    so this is cheap enough to run for value edits. Re-parenting in the node
+    editor is done in C and isn't reported by msgbus, so it is caught here.
+    Relabelling is handled by the msgbus subscriptions, and exposing or
+    excluding nodes by their property update callbacks.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+
+    Returns:
+        bool: True if the tree's structure changed
+    """
+    changed = revalidate_tree(tree)
+    if is_stale(tree):
+        changed = True
+    if changed:
+        invalidate_hierarchy(tree)
+    return changed
+
 
 @persistent
-def update_enums(dummy):
+@stats.timed('update_enums')
+def update_enums(scene, depsgraph):
     """If necessary resets enums on depsgraph update.
 
+    Caches are only dropped and enums only revalidated for node trees whose
+    structure changed in this update, or whose owner (scene, active object
+    or active material) has changed since the last update. Plain value edits
+    only cost a walk over node and parent names and a lookup of each exposed
+    frame. Updates
+    during animation playback are skipped as they can't change which frames
+    are exposed.
+
     Args:
-        dummy (any): dummy variable
+        scene (bpy.types.Scene): scene
+        depsgraph (bpy.types.Depsgraph): depsgraph
     """
-    context = bpy.context
-    scene = context.scene
+    global _last_owners
+
+    screen = bpy.context.screen
+    if screen is not None and screen.is_animation_playing:
+        return
+
+    updated = set()
+    changed = set()
+    texture_updated = False
+    for update in depsgraph.updates:
+        id_data = update.id.original
+        if isinstance(id_data, bpy.types.Object) and update.is_updated_transform \
+                and not (update.is_updated_geometry or update.is_updated_shading):
+            continue
+        updated.add(id_data.as_pointer())
+        if isinstance(id_data, bpy.types.Object):
+            touch_object(id_data)
+        if isinstance(id_data, bpy.types.Scene):
+            tree = id_data.node_tree
+            if tree is not None and structure_changed(tree):
+                changed.add(tree.as_pointer())
+            continue
+        if isinstance(id_data, bpy.types.Texture):
+            texture_updated = True
+        tree = get_updated_tree(id_data)
+        if tree is None:
+            continue
+        updated.add(tree.as_pointer())
+        if structure_changed(tree):
+            changed.add(tree.as_pointer())
+            if isinstance(tree, bpy.types.TextureNodeTree):
+                update_texture_tree(tree)
+                texture_updated = True
+
     scene_props = scene.ne_scene_props
-    try:
-        comp_nodes = context.scene.node_tree.nodes
+    obj = bpy.context.object
+    mat = obj.active_material if obj else None
 
-        comp_frames = sorted([
-            n for n in comp_nodes
-            if n.type == 'FRAME' and n.ne_node_props.expose_frame],
-            key=lambda n: n.label)
+    owners = (scene.as_pointer(),
+              obj.as_pointer() if obj else None,
+              mat.as_pointer() if mat else None)
+    owners_changed = owners != _last_owners
+    _last_owners = owners
 
-        if comp_frames:
-            comp_tlf = scene_props.comp_top_level_frame
-            if comp_tlf not in [f.name for f in comp_frames]:
-                context.scene.ne_scene_props.comp_top_level_frame = comp_frames[0].name
+    try:
+        tree = scene.node_tree
+        if owners_changed or tree.as_pointer() in changed:
+            validate_top_level_frame(scene_props, 'comp_top_level_frame', tree)
     except (AttributeError, KeyError):
         pass
     try:
-        mat_nodes = context.object.active_material.node_tree.nodes
-        mat_frames = sorted([
-            n for n in mat_nodes
-            if n.type == 'FRAME' and n.ne_node_props.expose_frame],
-            key=lambda n: n.label)
-
-        if mat_frames:
-            mat_tlf = scene_props.mat_top_level_frame
-            if mat_tlf not in [f.name for f in mat_frames]:
-                context.scene.ne_scene_props.mat_top_level_frame = mat_frames[0].name
-    except(AttributeError, KeyError):
+        tree = mat.node_tree
+        if owners_changed or tree.as_pointer() in changed:
+            validate_top_level_frame(scene_props, 'mat_top_level_frame', tree)
+    except (AttributeError, KeyError):
         pass
     try:
-        obj = context.object
-        mods = sorted([m.name for m in obj.modifiers if m.type ==
-                       'NODES'], key=lambda m: m.name)
-
-        for mod in mods:
-            frames = [f for f in mod.node_group.nodes if f.type == 'FRAME']
-            if not frames:
-                mods.remove(mod)
-        if mods:
-            geom_node_mod = scene_props.geom_node_mod
-            if geom_node_mod not in mods:
-                context.scene.ne_scene_props.geom_node_mod = mods[0].name
-    except(AttributeError, KeyError):
+        mod_changed = owners_changed or obj.as_pointer() in updated
+        if mod_changed:
+            validate_geom_node_mod(scene_props, obj)
+        tree = obj.modifiers[scene_props.geom_node_mod].node_group
+        if mod_changed or tree.as_pointer() in changed:
+            validate_top_level_frame(scene_props, 'geom_top_level_frame', tree)
+    except (AttributeError, KeyError):
         pass
     try:
-        geom_nodes = context.object.modifiers[scene_props.geom_node_mod].node_group.nodes
-        geom_frames = sorted([
-            n for n in geom_nodes
-            if n.type == 'FRAME' and n.ne_node_props.expose_frame],
-            key=lambda n: n.label)
-
-        if geom_frames:
-            geom_tlf = scene_props.geom_top_level_frame
-            if geom_tlf not in [f.name for f in geom_frames]:
-                context.scene.ne_scene_props.geom_top_level_frame = geom_frames[0].name
-    except(AttributeError, KeyError):
+        if owners_changed or texture_updated:
+            tree = bpy.data.textures[scene_props.active_texture].node_tree
+            validate_top_level_frame(
+                scene_props, 'texture_top_level_frame', tree)
+    except (AttributeError, KeyError):
         pass
+
+    if scene_props.batch_edit:
+        queue_batch_edits(bpy.context, updated)
+
+
+BATCH_TREE_TYPES = ('MATERIAL', 'GEOMETRY')
+# seconds without new batch edits before they are copied, so a slider drag is one undo step
+BATCH_EDIT_DELAY = 0.2
+
+
+def snapshot_batch_sources(context):
+    """Record current values of the active trees so the next edit can be detected.
+
+    Args:
+        context (bpy.types.Context): context
+    """
+    for tree_type in BATCH_TREE_TYPES:
+        try:
+            tree, top_level_frame = get_source(context, tree_type)
+        except (AttributeError, KeyError):
+            continue
+        if tree is not None:
+            take_snapshot(tree_type, tree, top_level_frame)
+
+
+def queue_batch_edits(context, updated):
+    """Queue exposed values changed in the active trees to be copied to selected objects.
+
+    Only active trees the depsgraph reported as updated are reread. If the
+    active tree or top level frame has changed since the last update a new
+    snapshot is taken instead.
+
+    Args:
+        context (bpy.types.Context): context
+        updated (set[int]): pointers of IDs updated by the depsgraph
+    """
+    for tree_type in BATCH_TREE_TYPES:
+        try:
+            tree, top_level_frame = get_source(context, tree_type)
+        except (AttributeError, KeyError):
+            continue
+        if tree is None:
+            continue
+        if not has_snapshot(tree_type, tree, top_level_frame):
+            take_snapshot(tree_type, tree, top_level_frame)
+            continue
+        if tree.as_pointer() not in updated:
+            continue
+        changes = detect_changes(tree_type, tree, top_level_frame)
+        if changes:
+            targets = get_targets(context.selected_objects, tree, tree_type,
+                                  top_level_frame, context.object)
+            add_pending(tree_type, changes, targets)
+            add_timer(functools.partial(apply_batch_edits, tree_type),
+                      name=__name__ + '.apply_batch_edits.' + tree_type)
+
+
+def apply_batch_edits(tree_type):
+    """Copy queued batch edits to the trees of the objects selected when they were made.
+
+    Runs from a timer, as the depsgraph handler runs after the edit's undo
+    push and can't call operators. The timer waits until no edits have been
+    queued for BATCH_EDIT_DELAY seconds, so a slider drag is copied once.
+    The values are written by an undoable operator, which adds its own undo
+    step after the edit's, so redo restores the source and targets together.
+
+    Args:
+        tree_type (str): 'MATERIAL' or 'GEOMETRY'
+
+    Returns:
+        float | None: seconds until the timer runs again, None to stop
+    """
+    idle = seconds_since_queued(tree_type)
+    if idle is None:
+        return None
+    if idle < BATCH_EDIT_DELAY:
+        return BATCH_EDIT_DELAY - idle
+    bpy.ops.node_expose.apply_batch_edits('EXEC_DEFAULT', True, tree_type=tree_type)
+    return None
+
+
+@persistent
+def reset_hierarchies(dummy):
+    """Discard all cached frame hierarchies and exposed frame counts on file load and undo.
+
+    Args:
+        dummy (any): dummy variable
+    """
+    global _last_owners
+    _last_owners = None
+    clear_hierarchies()
+    clear_registry()
+    clear_enum_cache()
+    clear_layouts()
+    clear_parameter_index()
+    reset_staging()
+    reset_batch()
     try:
-        texture_nodes = bpy.data.textures[scene_props.active_texture].node_tree.nodes
-        texture_frames = sorted([
-            n for n in texture_nodes
-            if n.type == 'FRAME' and n.ne_node_props.expose_frame],
-            key=lambda n: n.label)
-
-        if texture_frames:
-            texture_tlf = scene_props.texture_top_level_frame
-            if texture_tlf not in [f.name for f in texture_frames]:
-                context.scene.ne_scene_props.texture_top_level_frame = texture_frames[0].name
-    except (AttributeError, KeyError):
+        if bpy.context.scene.ne_scene_props.batch_edit:
+            snapshot_batch_sources(bpy.context)
+    except AttributeError:
         pass
 
 
-bpy.app.handlers.depsgraph_update_pre.append(update_enums)
+class NODE_EXPOSE_PT_Debug_Stats(Panel):
+    bl_idname = 'NODE_EXPOSE_PT_Debug_Stats'
+    bl_label = 'Node Expose Timings'
+    bl_space_type = 'NODE_EDITOR'
+    bl_region_type = 'UI'
+    bl_category = 'Node Expose'
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context):
+        return stats.is_enabled()
+
+    def draw(self, context):
+        """Draw timings of panel polls, draws and handlers, slowest first.
+
+        Args:
+            context (bpy.types.Context): Blender context
+        """
+        layout = self.layout
+        row = layout.row()
+        row.operator('node_expose.export_stats', icon='EXPORT')
+        row.operator('node_expose.reset_stats', icon='X')
+
+        installed = handler_report()
+        col = layout.column(align=True)
+        col.label(text="%d handlers and timers installed" % len(installed))
+        for event, key, calls, total_ms in installed:
+            col.label(text="    %s: %s  %d calls  %.3fms" % (
+                event, key.rsplit('.', 1)[-1], calls, total_ms))
+
+        timings = sorted(stats.get_stats().items(),
+                         key=lambda item: item[1].total, reverse=True)
+        if not timings:
+            layout.label(text="No calls recorded yet.")
+            return
+
+        col = layout.column(align=True)
+        for name, call_stats in timings:
+            col.label(text=name)
+            col.label(text="    %d calls  mean %.3fms  p95 %.3fms  max %.3fms" % (
+                call_stats.count,
+                call_stats.mean_ms(),
+                call_stats.percentile_ms(95),
+                call_stats.max * 1000))
+
+
+# wrap polls and draws so they can be timed when enabled in preferences.
+for panel_cls in (
+        NODE_EXPOSE_PT_Material_3D_N_Panel,
+        NODE_EXPOSE_PT_Material_Node_N_Panel,
+        NODE_EXPOSE_PT_Material_options,
+        NODE_EXPOSE_PT_Geometry_Nodes_N_Panel,
+        NODE_EXPOSE_PT_Geometry_View_3D_N_Panel,
+        NODE_EXPOSE_PT_Compositor_View_3D_N_Panel,
+        NODE_EXPOSE_PT_Compositor_Nodes_N_Panel,
+        NODE_EXPOSE_PT_Texture_Nodes_N_Panel,
+        NODE_EXPOSE_PT_Texture_View_3D_N_Panel,
+        NODE_EXPOSE_PT_Node_Options):
+    stats.instrument_panel(panel_cls)
+
+
+# preference that switches each panel on or off. Panels that are switched off
+# are unregistered so Blender doesn't poll them at all.
+PANEL_PREFS = {
+    'expose_mat_nodes_in_3d_n_panel': NODE_EXPOSE_PT_Material_3D_N_Panel,
+    'expose_mat_nodes_in_node_n_panel': NODE_EXPOSE_PT_Material_Node_N_Panel,
+    'expose_mat_nodes_in_mat_props': NODE_EXPOSE_PT_Material_options,
+    'expose_geom_nodes_in_3d_n_panel': NODE_EXPOSE_PT_Geometry_View_3D_N_Panel,
+    'expose_geom_nodes_in_node_n_panel': NODE_EXPOSE_PT_Geometry_Nodes_N_Panel,
+    'expose_comp_nodes_in_3d_n_panel': NODE_EXPOSE_PT_Compositor_View_3D_N_Panel,
+    'expose_comp_nodes_in_node_n_panel': NODE_EXPOSE_PT_Compositor_Nodes_N_Panel,
+    'expose_texture_nodes_in_3d_n_panel': NODE_EXPOSE_PT_Texture_View_3D_N_Panel,
+    'expose_texture_nodes_in_node_n_panel': NODE_EXPOSE_PT_Texture_Nodes_N_Panel,
+    'expose_spreadsheet_in_node_n_panel': NODE_EXPOSE_PT_Spreadsheet_Node_N_Panel,
+    'expose_spreadsheet_in_3d_n_panel': NODE_EXPOSE_PT_Spreadsheet_3D_N_Panel,
+}
+
+
+def sync_panel_registration(prefs):
+    """Register panels switched on in preferences and unregister the rest.
+
+    Args:
+        prefs (ModModMaterialPreferences): addon preferences
+    """
+    if bpy.app.background:
+        return
+    for pref, panel_cls in PANEL_PREFS.items():
+        enabled = getattr(prefs, pref)
+        if enabled and not panel_cls.is_registered:
+            bpy.utils.register_class(panel_cls)
+        elif not enabled and panel_cls.is_registered:
+            bpy.utils.unregister_class(panel_cls)
 
 
 def register():
@@ -899,8 +1470,22 @@ def register():
         type=NODE_EXPOSE_Scene_Props)
     bpy.types.Node.ne_node_props = PointerProperty(
         type=NODE_EXPOSE_Node_Props)
+    # in background mode nothing is drawn, so panels and the handler keeping
+    # their enums up to date are left out
+    if not bpy.app.background:
+        prefs = get_prefs()
+        stats.set_enabled(prefs.enable_profiling)
+        sync_panel_registration(prefs)
+        add_handler('depsgraph_update_post', update_enums)
+    for event in ('load_post', 'undo_post', 'redo_post'):
+        add_handler(event, reset_hierarchies)
 
 
 def unregister():
+    remove_module(__name__)
+    clear_hierarchies()
+    clear_registry()
+    clear_enum_cache()
+    clear_layouts()
     del bpy.types.Node.ne_node_props
     del bpy.types.Scene.ne_scene_props
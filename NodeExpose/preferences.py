@@ -1,5 +1,17 @@
 from bpy.types import AddonPreferences
-from bpy.props import BoolProperty
+from bpy.props import BoolProperty, IntProperty, StringProperty
+from .lib import stats
+from .lib.utils import update_prefs_snapshot
+from . import panels
+
+
+def update_prefs(self, context):
+    update_prefs_snapshot(self)
+
+
+def update_panels(self, context):
+    update_prefs_snapshot(self)
+    panels.sync_panel_registration(self)
 
 
 class ModModMaterialPreferences(AddonPreferences):
@@ -7,47 +19,106 @@ class ModModMaterialPreferences(AddonPreferences):
 
     expose_mat_nodes_in_3d_n_panel: BoolProperty(
         name="Expose material nodes in 3D view N panel",
-        default=True
+        default=True,
+        update=update_panels
     )
 
     expose_mat_nodes_in_mat_props: BoolProperty(
         name="Expose material nodes in material properties panel",
-        default=True
+        default=True,
+        update=update_panels
     )
 
     expose_mat_nodes_in_node_n_panel: BoolProperty(
         name="Expose material nodes in node editor N panel",
-        default=True
+        default=True,
+        update=update_panels
     )
 
     expose_geom_nodes_in_3d_n_panel: BoolProperty(
         name="Expose geometry nodes in 3D view N panel",
-        default=True
+        default=True,
+        update=update_panels
     )
 
     expose_geom_nodes_in_node_n_panel: BoolProperty(
         name="Expose geometry nodes in node editor N panel",
-        default=True
+        default=True,
+        update=update_panels
     )
 
     expose_comp_nodes_in_node_n_panel: BoolProperty(
         name="Expose compositor nodes in node editor N panel",
-        default=True
+        default=True,
+        update=update_panels
     )
 
     expose_comp_nodes_in_3d_n_panel: BoolProperty(
         name="Expose compositor nodes in 3D view N panel",
-        default=True
+        default=True,
+        update=update_panels
     )
 
     expose_texture_nodes_in_node_n_panel: BoolProperty(
         name="Expose texture nodes in node editor N panel",
-        default=True
+        default=True,
+        update=update_panels
     )
 
     expose_texture_nodes_in_3d_n_panel: BoolProperty(
         name="Expose texture nodes in 3D view N panel",
-        default=True
+        default=True,
+        update=update_panels
+    )
+
+    expose_spreadsheet_in_node_n_panel: BoolProperty(
+        name="Show all exposed parameters in node editor N panel",
+        default=True,
+        update=update_panels
+    )
+
+    expose_spreadsheet_in_3d_n_panel: BoolProperty(
+        name="Show all exposed parameters in 3D view N panel",
+        default=True,
+        update=update_panels
+    )
+
+    rows_per_page: IntProperty(
+        name="Nodes per page",
+        description="Frames containing more nodes than this are shown a page at a time",
+        default=50,
+        min=1,
+        update=update_prefs
+    )
+
+    max_expanded_nodes: IntProperty(
+        name="Max expanded nodes",
+        description="Maximum number of expanded nodes drawn in full per redraw. "
+        "Further expanded nodes are shown as a one line summary",
+        default=25,
+        min=1,
+        update=update_prefs
+    )
+
+    preset_directory: StringProperty(
+        name="Preset directory",
+        description="Directory of the shared preset library. "
+        "Leave empty to use the presets folder of the user scripts directory",
+        subtype='DIR_PATH',
+        default="",
+        update=update_prefs
+    )
+
+    def update_profiling(self, context):
+        update_prefs_snapshot(self)
+        stats.set_enabled(self.enable_profiling)
+
+    enable_profiling: BoolProperty(
+        name="Record timings of panels and handlers",
+        description="Time every Node Expose panel poll and draw and the depsgraph handler. "
+        "Timings are shown in the Node Expose tab of the node editor",
+        default=False,
+        update=update_profiling
     )
 
     def draw(self, context):
@@ -61,3 +132,12 @@ class ModModMaterialPreferences(AddonPreferences):
         layout.prop(self, 'expose_comp_nodes_in_3d_n_panel')
         layout.prop(self, 'expose_texture_nodes_in_node_n_panel')
         layout.prop(self, 'expose_texture_nodes_in_3d_n_panel')
+        layout.prop(self, 'expose_spreadsheet_in_node_n_panel')
+        layout.prop(self, 'expose_spreadsheet_in_3d_n_panel')
+        layout.separator()
+        layout.prop(self, 'rows_per_page')
+        layout.prop(self, 'max_expanded_nodes')
+        layout.separator()
+        layout.prop(self, 'preset_directory')
+        layout.separator()
+        layout.prop(self, 'enable_profiling')
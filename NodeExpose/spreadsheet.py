@@ -0,0 +1,138 @@
+import bpy
+from bpy.app.handlers import persistent
+from bpy.props import CollectionProperty, IntProperty, PointerProperty
+from bpy.types import Panel, PropertyGroup, UIList
+from .lib.param_index import get_parameter_index, mark_parameter_index_dirty
+from .lib.handlers import add_handler, add_timer, remove_module
+from .lib import stats
+
+# UIList column widths of owner, frame, node and socket, value takes the rest
+COLUMNS = (0.18, 0.22, 0.28, 0.4)
+
+OWNER_ICONS = {
+    'MATERIAL': 'MATERIAL',
+    'GEOMETRY': 'GEOMETRY_NODES',
+    'COMPOSITOR': 'NODE_COMPOSITING',
+    'TEXTURE': 'TEXTURE'}
+
+
+class NODE_EXPOSE_Spreadsheet_Row(PropertyGroup):
+    """Placeholder for one row of the parameter index.
+
+    The UIList only needs a collection of the right length, the row data
+    itself lives in the parameter index.
+    """
+
+
+class NODE_EXPOSE_Spreadsheet_Props(PropertyGroup):
+    rows: CollectionProperty(type=NODE_EXPOSE_Spreadsheet_Row)
+    active_row: IntProperty()
+
+
+class NODE_EXPOSE_UL_Spreadsheet(UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        rows = get_parameter_index().rows
+        if index >= len(rows):
+            return
+        row = rows[index]
+        split = layout.split(factor=COLUMNS[0])
+        split.label(text=row.owner, icon=OWNER_ICONS[row.owner_type])
+        for column, factor in zip(row[2:5], COLUMNS[1:]):
+            split = split.split(factor=factor)
+            split.label(text=column)
+        split.prop(row.socket, 'default_value', text='')
+
+    def filter_items(self, context, data, propname):
+        index = get_parameter_index()
+        if len(getattr(data, propname)) != len(index.rows):
+            return [], []
+        return index.filter(self.filter_name, self.use_filter_sort_alpha, self.bitflag_filter_item)
+
+
+class Spreadsheet:
+    def draw_spreadsheet(self, context):
+        props = context.window_manager.ne_spreadsheet_props
+        # rows are rebuilt before drawing so no row refers to a deleted node,
+        # only resizing the UIList collection has to wait for a timer
+        index = get_parameter_index()
+        if index.dirty:
+            index.refresh()
+        if len(props.rows) != len(index.rows):
+            add_timer(refresh_rows)
+        self.layout.template_list(
+            'NODE_EXPOSE_UL_Spreadsheet', '', props, 'rows', props, 'active_row', rows=20)
+
+
+class NODE_EXPOSE_PT_Spreadsheet_Node_N_Panel(Panel, Spreadsheet):
+    bl_idname = 'NODE_EXPOSE_PT_Spreadsheet_Node_N_Panel'
+    bl_label = 'All Exposed Parameters'
+    bl_space_type = 'NODE_EDITOR'
+    bl_region_type = 'UI'
+    bl_category = 'Node Expose'
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        self.draw_spreadsheet(context)
+
+
+class NODE_EXPOSE_PT_Spreadsheet_3D_N_Panel(Panel, Spreadsheet):
+    bl_idname = 'NODE_EXPOSE_PT_Spreadsheet_3D_N_Panel'
+    bl_label = 'All Exposed Parameters'
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'Node Expose'
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        self.draw_spreadsheet(context)
+
+
+# wrap draws so they can be timed when enabled in preferences.
+for panel_cls in (
+        NODE_EXPOSE_PT_Spreadsheet_Node_N_Panel,
+        NODE_EXPOSE_PT_Spreadsheet_3D_N_Panel):
+    stats.instrument_panel(panel_cls)
+
+
+def refresh_rows():
+    """Resize the UIList collection to match the parameter index.
+
+    Run as a timer as ID properties can't be written while drawing.
+    """
+    index = get_parameter_index()
+    if index.dirty:
+        index.refresh()
+    rows = bpy.context.window_manager.ne_spreadsheet_props.rows
+    num_rows = len(index.rows)
+    if len(rows) == num_rows:
+        return None
+    while len(rows) > num_rows:
+        rows.remove(len(rows) - 1)
+    for _ in range(num_rows - len(rows)):
+        rows.add()
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type in {'NODE_EDITOR', 'VIEW_3D'}:
+                area.tag_redraw()
+    return None
+
+
+@persistent
+def on_depsgraph_update(scene, depsgraph):
+    # moving objects doesn't change which parameters there are
+    mark_parameter_index_dirty(
+        update.id.original for update in depsgraph.updates
+        if not (update.is_updated_transform
+                and not (update.is_updated_geometry or update.is_updated_shading)))
+
+
+def register():
+    bpy.types.WindowManager.ne_spreadsheet_props = PointerProperty(
+        type=NODE_EXPOSE_Spreadsheet_Props)
+    if not bpy.app.background:
+        add_handler('depsgraph_update_post', on_depsgraph_update)
+
+
+def unregister():
+    remove_module(__name__)
+    del bpy.types.WindowManager.ne_spreadsheet_props
@@ -0,0 +1,274 @@
+"""Staged editing of exposed values.
+
+While staging, the panels draw exposed sockets through copies of their values
+held on the window manager instead of the sockets themselves, so editing them
+doesn't touch the node tree. Apply then writes every changed value in one
+operator, so the tree is re-evaluated once for all of them.
+"""
+import bpy
+from bpy.props import (
+    BoolProperty,
+    CollectionProperty,
+    EnumProperty,
+    FloatProperty,
+    FloatVectorProperty,
+    IntProperty,
+    PointerProperty)
+from bpy.types import PropertyGroup
+from .lib.snapshot import get_layout
+
+# value property of staged values by kind. Float and vector sockets get a
+# property with the same subtype, so e.g. angles are edited in degrees.
+VALUE_PROPS = {
+    'FLOAT': 'float_value',
+    'FACTOR': 'factor_value',
+    'PERCENTAGE': 'percentage_value',
+    'ANGLE': 'angle_value',
+    'DISTANCE': 'distance_value',
+    'INT': 'int_value',
+    'BOOLEAN': 'bool_value',
+    'VECTOR': 'vector_value',
+    'EULER': 'euler_value',
+    'TRANSLATION': 'translation_value',
+    'COLOR': 'color_value'}
+
+FLOAT_SUBTYPES = {'FACTOR', 'PERCENTAGE', 'ANGLE', 'DISTANCE'}
+VECTOR_SUBTYPES = {'EULER', 'TRANSLATION'}
+
+_staged_key = None
+_staged_tree = None
+_sockets = {}
+_pending = None
+
+
+def on_staged_value_changed(self, context):
+    """Clamp edited value to the range of its socket and reset pending count."""
+    global _pending
+    _pending = None
+    if self.kind == 'BOOLEAN':
+        return
+    prop = VALUE_PROPS[self.kind]
+    value = getattr(self, prop)
+    if isinstance(value, (int, float)):
+        clamped = type(value)(min(max(value, self.min_value), self.max_value))
+        if clamped != value:
+            setattr(self, prop, clamped)
+    else:
+        clamped = [min(max(v, self.min_value), self.max_value) for v in value]
+        if clamped != list(value):
+            setattr(self, prop, clamped)
+
+
+class NODE_EXPOSE_Staged_Value(PropertyGroup):
+    kind: EnumProperty(
+        items=[(kind, kind.title(), "") for kind in VALUE_PROPS])
+
+    # hard limits of the socket's value, set when staging starts
+    min_value: FloatProperty()
+    max_value: FloatProperty()
+
+    float_value: FloatProperty(update=on_staged_value_changed)
+    factor_value: FloatProperty(subtype='FACTOR', update=on_staged_value_changed)
+    percentage_value: FloatProperty(subtype='PERCENTAGE', update=on_staged_value_changed)
+    angle_value: FloatProperty(subtype='ANGLE', update=on_staged_value_changed)
+    distance_value: FloatProperty(subtype='DISTANCE', update=on_staged_value_changed)
+    int_value: IntProperty(update=on_staged_value_changed)
+    bool_value: BoolProperty(update=on_staged_value_changed)
+    vector_value: FloatVectorProperty(size=3, update=on_staged_value_changed)
+    euler_value: FloatVectorProperty(size=3, subtype='EULER', update=on_staged_value_changed)
+    translation_value: FloatVectorProperty(
+        size=3, subtype='TRANSLATION', update=on_staged_value_changed)
+    color_value: FloatVectorProperty(
+        size=4, subtype='COLOR', soft_min=0, soft_max=1, update=on_staged_value_changed)
+
+
+class NODE_EXPOSE_Staged_Props(PropertyGroup):
+    values: CollectionProperty(type=NODE_EXPOSE_Staged_Value)
+
+
+def get_kind(socket):
+    """Return kind of staged value that can hold a socket's value.
+
+    Args:
+        socket (bpy.types.NodeSocket): socket
+
+    Returns:
+        str | None: key of VALUE_PROPS or None if the value can't be staged
+    """
+    value = socket.default_value
+    if isinstance(value, bool):
+        return 'BOOLEAN'
+    if isinstance(value, int):
+        return 'INT'
+    subtype = socket.bl_rna.properties['default_value'].subtype
+    if isinstance(value, float):
+        return subtype if subtype in FLOAT_SUBTYPES else 'FLOAT'
+    if hasattr(value, 'foreach_get'):
+        if len(value) == 3:
+            return subtype if subtype in VECTOR_SUBTYPES else 'VECTOR'
+        if len(value) == 4:
+            return 'COLOR'
+    return None
+
+
+def is_staging(tree, top_level_frame):
+    """Return True if edits below a top level frame are being staged.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree
+        top_level_frame (str): name of top level frame
+
+    Returns:
+        bool: staging
+    """
+    return _staged_key == (tree.as_pointer(), top_level_frame)
+
+
+def start_staging(context, tree, top_level_frame):
+    """Stage edits of the exposed values below a top level frame.
+
+    Args:
+        context (bpy.types.Context): context
+        tree (bpy.types.NodeTree): node tree
+        top_level_frame (str): name of top level frame
+
+    Returns:
+        int: number of staged values
+    """
+    global _staged_key
+    global _staged_tree
+    global _pending
+    staged = context.window_manager.ne_staged_props.values
+    staged.clear()
+    _sockets.clear()
+    for node, socket, kind, offset, length in get_layout(tree, top_level_frame).sockets:
+        if socket.is_linked:
+            continue
+        kind = get_kind(socket)
+        if kind is None:
+            continue
+        item = staged.add()
+        item.kind = kind
+        if kind != 'BOOLEAN':
+            prop = socket.bl_rna.properties['default_value']
+            item.min_value = prop.hard_min
+            item.max_value = prop.hard_max
+        setattr(item, VALUE_PROPS[kind], socket.default_value)
+        _sockets[socket.as_pointer()] = len(staged) - 1
+    _staged_key = (tree.as_pointer(), top_level_frame)
+    _staged_tree = tree
+    _pending = 0
+    return len(_sockets)
+
+
+def stop_staging(context):
+    """Discard staged values."""
+    reset_staging()
+    context.window_manager.ne_staged_props.values.clear()
+
+
+def reset_staging():
+    """Forget staged sockets, e.g. after undo or file load."""
+    global _staged_key
+    global _staged_tree
+    global _pending
+    _staged_key = None
+    _staged_tree = None
+    _pending = None
+    _sockets.clear()
+
+
+def get_staged_value(context, socket):
+    """Return staged value of socket and whether it differs from the socket's value.
+
+    Args:
+        context (bpy.types.Context): context
+        socket (bpy.types.NodeSocket): socket
+
+    Returns:
+        tuple[NODE_EXPOSE_Staged_Value | None, bool]: staged value, or None if
+            socket is not staged, and whether it is pending
+    """
+    index = _sockets.get(socket.as_pointer())
+    if index is None:
+        return None, False
+    item = context.window_manager.ne_staged_props.values[index]
+    return item, is_pending(item, socket)
+
+
+def is_pending(item, socket):
+    value = getattr(item, VALUE_PROPS[item.kind])
+    if not isinstance(value, (bool, int, float)):
+        return tuple(value) != tuple(socket.default_value)
+    return value != socket.default_value
+
+
+def pending_count(context):
+    """Return number of staged values that differ from their sockets.
+
+    The count is cached until a staged value is edited or applied.
+
+    Args:
+        context (bpy.types.Context): context
+
+    Returns:
+        int: number of pending values
+    """
+    global _pending
+    if _pending is None:
+        staged = context.window_manager.ne_staged_props.values
+        _pending = sum(
+            is_pending(staged[index], socket) for socket, index in iter_staged_sockets())
+    return _pending
+
+
+def iter_staged_sockets():
+    """Yield staged sockets that are still below the staged top level frame.
+
+    Sockets are looked up through the current layout rather than kept, so
+    sockets of nodes deleted since staging started are skipped.
+
+    Yields:
+        tuple[bpy.types.NodeSocket, int]: socket and index of its staged value
+    """
+    if _staged_key is None:
+        return
+    for node, socket, kind, offset, length in get_layout(_staged_tree, _staged_key[1]).sockets:
+        index = _sockets.get(socket.as_pointer())
+        if index is not None:
+            yield socket, index
+
+
+def apply_staged(context):
+    """Write staged values that differ from their sockets.
+
+    Args:
+        context (bpy.types.Context): context
+
+    Returns:
+        int: number of sockets written
+    """
+    global _pending
+    staged = context.window_manager.ne_staged_props.values
+    written = 0
+    for socket, index in iter_staged_sockets():
+        item = staged[index]
+        if is_pending(item, socket):
+            prop = VALUE_PROPS[item.kind]
+            socket.default_value = getattr(item, prop)
+            # the socket may clamp to a narrower range, e.g. a group input's,
+            # so show what was actually written
+            setattr(item, prop, socket.default_value)
+            written += 1
+    _pending = 0
+    return written
+
+
+def register():
+    bpy.types.WindowManager.ne_staged_props = PointerProperty(
+        type=NODE_EXPOSE_Staged_Props)
+
+
+def unregister():
+    reset_staging()
+    del bpy.types.WindowManager.ne_staged_props
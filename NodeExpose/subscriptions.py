@@ -0,0 +1,69 @@
+import bpy
+from bpy.app.handlers import persistent
+from .lib.hierarchy import invalidate_hierarchy
+from .lib.handlers import add_handler, remove_module
+
+# msgbus owner for all Node Expose subscriptions
+_owner = object()
+
+
+def iter_edited_trees():
+    """Yield node trees open in a node editor of any window.
+
+    Yields:
+        bpy.types.NodeTree: node tree
+    """
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'NODE_EDITOR':
+                tree = area.spaces.active.edit_tree
+                if tree is not None:
+                    yield tree
+
+
+def on_node_label_changed():
+    """Discard the cached frame hierarchy of the tree whose node was relabelled.
+
+    msgbus doesn't tell us which node changed, but labels are only edited in
+    the node editor, so only the hierarchies of the trees open in node
+    editors are dropped, along with their search indices. They are rebuilt
+    lazily, so only trees that are drawn again pay for it.
+    """
+    for tree in iter_edited_trees():
+        invalidate_hierarchy(tree)
+
+
+def subscribe():
+    """Subscribe to the node properties the addon's caches depend on.
+
+    expose_frame and exclude_node are not subscribed to here as their
+    update callbacks already invalidate the caches of their own node tree.
+    Added, deleted, renamed and re-parented nodes are picked up by the
+    signature check in get_hierarchy.
+    """
+    bpy.msgbus.clear_by_owner(_owner)
+    bpy.msgbus.subscribe_rna(
+        key=(bpy.types.Node, 'label'),
+        owner=_owner,
+        args=(),
+        notify=on_node_label_changed)
+
+
+@persistent
+def resubscribe(dummy):
+    """Restore subscriptions, which are cleared when a file is loaded.
+
+    Args:
+        dummy (any): dummy variable
+    """
+    subscribe()
+
+
+def register():
+    subscribe()
+    add_handler('load_post', resubscribe)
+
+
+def unregister():
+    remove_module(__name__)
+    bpy.msgbus.clear_by_owner(_owner)
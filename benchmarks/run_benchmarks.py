@@ -0,0 +1,247 @@
+"""Headless latency benchmarks for Node Expose.
+
+Run inside Blender, e.g.:
+
+    blender --background --factory-startup --python benchmarks/run_benchmarks.py -- \
+        --sizes 100 1000 10000 --depths 1 4 12 --output bench.json
+
+Pass --baseline with the JSON output of an earlier run to fail (exit code 1)
+when any median timing is more than --threshold times slower than the
+baseline, and --budget-ms to fail when any warm median exceeds an absolute
+budget.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import bpy
+import addon_utils
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(REPO_DIR))
+
+from synthetic_trees import TREE_MAKERS, TOP_LEVEL_FRAME  # noqa: E402
+
+ADDON = 'NodeExpose'
+
+# panels whose poll is timed for each kind of tree
+PANELS = {
+    'MATERIAL': (
+        'NODE_EXPOSE_PT_Material_3D_N_Panel',
+        'NODE_EXPOSE_PT_Material_Node_N_Panel',
+        'NODE_EXPOSE_PT_Material_options'),
+    'GEOMETRY': (
+        'NODE_EXPOSE_PT_Geometry_Nodes_N_Panel',
+        'NODE_EXPOSE_PT_Geometry_View_3D_N_Panel'),
+    'COMPOSITOR': (
+        'NODE_EXPOSE_PT_Compositor_View_3D_N_Panel',
+        'NODE_EXPOSE_PT_Compositor_Nodes_N_Panel'),
+    'TEXTURE': (
+        'NODE_EXPOSE_PT_Texture_Nodes_N_Panel',
+        'NODE_EXPOSE_PT_Texture_View_3D_N_Panel'),
+}
+
+# enum items callbacks timed for each kind of tree
+ENUM_CALLBACKS = {
+    'MATERIAL': ('create_mat_frame_enums',),
+    'GEOMETRY': ('create_geom_frame_enums', 'create_geom_node_mod_enums'),
+    'COMPOSITOR': ('create_comp_frame_enums',),
+    'TEXTURE': ('create_texture_frame_enums', 'create_texture_enums'),
+}
+
+
+class StubLayout:
+    """Minimal stand-in for bpy.types.UILayout that discards everything drawn."""
+
+    def __init__(self):
+        self.alignment = 'EXPAND'
+
+    def row(self, **kwargs):
+        return self
+
+    def split(self, **kwargs):
+        return self
+
+    def column(self, **kwargs):
+        return self
+
+    def prop(self, *args, **kwargs):
+        pass
+
+    def operator(self, *args, **kwargs):
+        return StubOperatorProperties()
+
+    def label(self, **kwargs):
+        pass
+
+    def separator(self, **kwargs):
+        pass
+
+    def context_pointer_set(self, *args):
+        pass
+
+
+class StubOperatorProperties:
+    """Accepts operator properties set on the result of StubLayout.operator."""
+
+
+class StubPanel:
+    """Stand-in for the panel passed to the display functions as self."""
+
+    def __init__(self):
+        self.layout = StubLayout()
+
+
+def time_call(func, repeats):
+    """Time func once cold and repeats times warm.
+
+    Args:
+        func (callable): function to time
+        repeats (int): number of warm calls
+
+    Returns:
+        dict: timings in milliseconds
+    """
+    start = time.perf_counter()
+    func()
+    cold = (time.perf_counter() - start) * 1000
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'cold_ms': cold,
+        'min_ms': min(samples),
+        'median_ms': statistics.median(samples),
+        'mean_ms': statistics.fmean(samples),
+    }
+
+
+def bench_tree(kind, num_nodes, depth, repeats):
+    """Run every benchmark for one synthetic tree.
+
+    Returns:
+        list[dict]: one result per timed operation
+    """
+    from NodeExpose.lib.recording_layout import Recorder, RecordingPanel
+
+    panels = sys.modules[ADDON + '.panels']
+    context = bpy.context
+    scene = context.scene
+    scene_props = scene.ne_scene_props
+
+    tree = TREE_MAKERS[kind](scene, num_nodes, depth)
+    results = []
+
+    def record(op, func):
+        # start every operation from empty caches so cold_ms is meaningful
+        panels.reset_hierarchies(None)
+        timings = time_call(func, repeats)
+        timings.update(tree=kind, nodes=num_nodes, depth=depth, op=op)
+        results.append(timings)
+
+    stub = StubPanel()
+    nodes = tree.nodes
+    record('display_frame', lambda: panels.display_frame(
+        stub, context, nodes, nodes[TOP_LEVEL_FRAME], TOP_LEVEL_FRAME))
+
+    # count the UI calls a single redraw makes
+    recorder = Recorder()
+    with recorder.patch(panels):
+        panels.display_frame(RecordingPanel(recorder), context, nodes,
+                             nodes[TOP_LEVEL_FRAME], TOP_LEVEL_FRAME)
+    results[-1]['ui_calls'] = dict(recorder.counts)
+
+    for name in PANELS[kind]:
+        cls = getattr(panels, name)
+        record('poll:' + name, lambda cls=cls: cls.poll(context))
+
+    for name in ENUM_CALLBACKS[kind]:
+        func = getattr(panels.NODE_EXPOSE_Scene_Props, name)
+        record('enum:' + name, lambda func=func: func(scene_props, context))
+
+    depsgraph = context.evaluated_depsgraph_get()
+    record('update_enums', lambda: panels.update_enums(scene, depsgraph))
+
+    return results
+
+
+def compare(results, baseline, threshold, budget_ms):
+    """Return list of regressions against baseline and budget.
+
+    Args:
+        results (list[dict]): results of this run
+        baseline (list[dict] | None): results of an earlier run
+        threshold (float): allowed slowdown factor against baseline
+        budget_ms (float | None): allowed warm median in milliseconds
+
+    Returns:
+        list[str]: descriptions of regressions
+    """
+    def key(r):
+        return (r['tree'], r['nodes'], r['depth'], r['op'])
+
+    previous = {key(r): r for r in baseline or ()}
+    failures = []
+    for result in results:
+        old = previous.get(key(result))
+        if old and result['median_ms'] > old['median_ms'] * threshold:
+            failures.append('%s %d nodes depth %d %s: %.3fms vs %.3fms baseline' % (
+                *key(result), result['median_ms'], old['median_ms']))
+        if budget_ms is not None and result['median_ms'] > budget_ms:
+            failures.append('%s %d nodes depth %d %s: %.3fms over %.3fms budget' % (
+                *key(result), result['median_ms'], budget_ms))
+    return failures
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--trees', nargs='+', default=list(TREE_MAKERS),
+                        choices=list(TREE_MAKERS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[100, 1000, 5000])
+    parser.add_argument('--depths', nargs='+', type=int, default=[1, 4, 12])
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--output', default='bench_output.json')
+    parser.add_argument('--baseline')
+    parser.add_argument('--threshold', type=float, default=1.25)
+    parser.add_argument('--budget-ms', type=float)
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    addon_utils.enable(ADDON, default_set=True)
+
+    results = []
+    for kind in args.trees:
+        for num_nodes in args.sizes:
+            for depth in args.depths:
+                print('Benchmarking %s, %d nodes, depth %d' % (kind, num_nodes, depth))
+                results.extend(bench_tree(kind, num_nodes, depth, args.repeats))
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'blender_version': bpy.app.version_string,
+            'results': results}, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+
+    failures = compare(results, baseline, args.threshold, args.budget_ms)
+    for failure in failures:
+        print('REGRESSION: ' + failure)
+    sys.exit(1 if failures else 0)
+
+
+main()
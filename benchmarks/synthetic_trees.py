@@ -0,0 +1,122 @@
+"""Generate synthetic node trees for benchmarking Node Expose.
+
+Every generated tree has an exposed top level frame containing a chain of
+nested frames ``depth`` levels deep. The requested number of nodes is spread
+evenly over the frames of the chain.
+"""
+import bpy
+
+# node types used to fill each kind of tree, cycled through in order
+NODE_TYPES = {
+    'MATERIAL': ('ShaderNodeValue', 'ShaderNodeMath', 'ShaderNodeValToRGB'),
+    'GEOMETRY': ('ShaderNodeValue', 'ShaderNodeMath', 'ShaderNodeValToRGB'),
+    'COMPOSITOR': ('CompositorNodeValue', 'CompositorNodeMath', 'CompositorNodeValToRGB'),
+    'TEXTURE': ('TextureNodeMath', 'TextureNodeValToRGB', 'TextureNodeMath'),
+}
+
+TOP_LEVEL_FRAME = 'NE_Bench_Top'
+BENCH_NAME = 'NE_Bench'
+
+
+def fill_tree(tree, kind, num_nodes, depth):
+    """Fill tree with nested frames and nodes.
+
+    Args:
+        tree (bpy.types.NodeTree): node tree to fill
+        kind (str): one of NODE_TYPES keys
+        num_nodes (int): number of non frame nodes to add
+        depth (int): nesting depth of frames below the top level frame
+
+    Returns:
+        bpy.types.NodeFrame: exposed top level frame
+    """
+    nodes = tree.nodes
+    nodes.clear()
+
+    top = nodes.new('NodeFrame')
+    top.name = TOP_LEVEL_FRAME
+    top.label = 'Top'
+    top.ne_node_props.expose_frame = True
+
+    frames = [top]
+    for i in range(depth):
+        frame = nodes.new('NodeFrame')
+        frame.label = 'Frame %03d' % i
+        frame.parent = frames[-1]
+        frames.append(frame)
+
+    node_types = NODE_TYPES[kind]
+    for i in range(num_nodes):
+        node = nodes.new(node_types[i % len(node_types)])
+        node.label = 'Node %06d' % i
+        node.parent = frames[i % len(frames)]
+        # C level widgets can't be drawn into a stub layout, so nodes are
+        # drawn collapsed and only the addon's own traversal is measured.
+        node.ne_node_props.subpanel_status = False
+
+    return top
+
+
+def get_bench_object(scene):
+    """Return benchmark mesh object, creating it and making it active if needed.
+
+    Args:
+        scene (bpy.types.Scene): scene
+
+    Returns:
+        bpy.types.Object: benchmark object
+    """
+    obj = bpy.data.objects.get(BENCH_NAME)
+    if obj is None:
+        obj = bpy.data.objects.new(BENCH_NAME, bpy.data.meshes.new(BENCH_NAME))
+        scene.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+    return obj
+
+
+def make_material_tree(scene, num_nodes, depth):
+    obj = get_bench_object(scene)
+    mat = bpy.data.materials.get(BENCH_NAME) or bpy.data.materials.new(BENCH_NAME)
+    mat.use_nodes = True
+    if not obj.data.materials:
+        obj.data.materials.append(mat)
+    fill_tree(mat.node_tree, 'MATERIAL', num_nodes, depth)
+    scene.ne_scene_props.mat_top_level_frame = TOP_LEVEL_FRAME
+    return mat.node_tree
+
+
+def make_geometry_tree(scene, num_nodes, depth):
+    obj = get_bench_object(scene)
+    group = bpy.data.node_groups.get(BENCH_NAME) \
+        or bpy.data.node_groups.new(BENCH_NAME, 'GeometryNodeTree')
+    mod = obj.modifiers.get(BENCH_NAME) or obj.modifiers.new(BENCH_NAME, 'NODES')
+    mod.node_group = group
+    fill_tree(group, 'GEOMETRY', num_nodes, depth)
+    scene.ne_scene_props.geom_node_mod = BENCH_NAME
+    scene.ne_scene_props.geom_top_level_frame = TOP_LEVEL_FRAME
+    return group
+
+
+def make_compositor_tree(scene, num_nodes, depth):
+    scene.use_nodes = True
+    fill_tree(scene.node_tree, 'COMPOSITOR', num_nodes, depth)
+    scene.ne_scene_props.comp_top_level_frame = TOP_LEVEL_FRAME
+    return scene.node_tree
+
+
+def make_texture_tree(scene, num_nodes, depth):
+    texture = bpy.data.textures.get(BENCH_NAME) \
+        or bpy.data.textures.new(BENCH_NAME, 'IMAGE')
+    texture.use_nodes = True
+    fill_tree(texture.node_tree, 'TEXTURE', num_nodes, depth)
+    scene.ne_scene_props.active_texture = BENCH_NAME
+    scene.ne_scene_props.texture_top_level_frame = TOP_LEVEL_FRAME
+    return texture.node_tree
+
+
+TREE_MAKERS = {
+    'MATERIAL': make_material_tree,
+    'GEOMETRY': make_geometry_tree,
+    'COMPOSITOR': make_compositor_tree,
+    'TEXTURE': make_texture_tree,
+}
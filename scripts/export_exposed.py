@@ -0,0 +1,155 @@
+"""Export every exposed parameter of many .blend files as JSON lines.
+
+Run with Python, not inside Blender:
+
+    python scripts/export_exposed.py "assets/**/*.blend" --blender /path/to/blender \
+        --jobs 8 --output exposed.jsonl
+
+Files are split into batches, and each batch is exported by a background
+Blender instance that opens the files one after another. Up to --jobs
+instances run at once. Records are written as they arrive, one JSON object
+per line, so the output can be consumed while the export is running. Files
+that fail to open, or that a crashed Blender instance didn't get to, produce
+a line with an "error" key. NaN and infinite values are written as null. The
+exit code is 1 if any file failed.
+
+The same script runs as the worker inside Blender.
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+ADDON = 'NodeExpose'
+
+# prefix of worker output lines holding records, anything else is Blender's own output
+MARKER = 'NE_EXPORT '
+# prefix of the worker output line sent once a file is finished, followed by its path
+DONE_MARKER = 'NE_DONE '
+
+
+def run_worker(filepaths):
+    """Open each file and print a marked JSON line per exposed socket.
+
+    Args:
+        filepaths (list[str]): .blend files
+    """
+    import bpy
+    import addon_utils
+    import importlib
+
+    sys.path.insert(0, str(REPO_DIR))
+    addon_utils.enable(ADDON, default_set=True)
+    export = importlib.import_module(ADDON + '.lib.export')
+
+    for filepath in filepaths:
+        try:
+            bpy.ops.wm.open_mainfile(filepath=filepath, load_ui=False)
+            for record in export.iter_records(filepath):
+                print(MARKER + json.dumps(record, allow_nan=False), flush=True)
+        except Exception as err:
+            print(MARKER + json.dumps({'file': filepath, 'error': str(err)}), flush=True)
+        print(DONE_MARKER + filepath, flush=True)
+
+
+def iter_files(patterns):
+    """Yield .blend files matching glob patterns, each once, in order.
+
+    Args:
+        patterns (list[str]): file names or recursive glob patterns
+
+    Yields:
+        str: absolute file path
+    """
+    seen = set()
+    for pattern in patterns:
+        for filepath in sorted(glob.glob(pattern, recursive=True)) or [pattern]:
+            filepath = os.path.abspath(filepath)
+            if filepath not in seen:
+                seen.add(filepath)
+                yield filepath
+
+
+def export_batch(blender, batch, output, lock):
+    """Run a Blender worker over a batch of files, streaming its records to output.
+
+    Args:
+        blender (str): Blender executable
+        batch (list[str]): .blend files
+        output (io.TextIOBase): file to write JSON lines to
+        lock (threading.Lock): serialises writes to output
+
+    Returns:
+        int: number of failed files
+    """
+    command = [blender, '--background', '--factory-startup',
+               '--python', __file__, '--', '--worker'] + batch
+    failed = 0
+    done = set()
+    with subprocess.Popen(command, stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL, text=True) as process:
+        for line in process.stdout:
+            if line.startswith(DONE_MARKER):
+                done.add(line[len(DONE_MARKER):].rstrip('\n'))
+                continue
+            if not line.startswith(MARKER):
+                continue
+            line = line[len(MARKER):]
+            if '"error"' in line and 'error' in json.loads(line):
+                failed += 1
+            with lock:
+                output.write(line)
+
+    # files the worker didn't finish, e.g. because Blender crashed
+    for filepath in batch:
+        if filepath not in done:
+            failed += 1
+            error = "Blender exited with code %d before finishing this file" % process.returncode
+            with lock:
+                output.write(json.dumps({'file': filepath, 'error': error}) + '\n')
+    return failed
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('files', nargs='+', help="files or glob patterns, ** matches directories")
+    parser.add_argument('--blender', default='blender', help="Blender executable")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help="number of Blender instances to run at once")
+    parser.add_argument('--batch-size', type=int, default=50,
+                        help="files opened by each Blender instance")
+    parser.add_argument('--output', help="file to write, defaults to standard output")
+    return parser.parse_args(argv)
+
+
+def main():
+    if '--' in sys.argv and '--worker' in sys.argv:
+        run_worker(sys.argv[sys.argv.index('--worker') + 1:])
+        return
+
+    args = parse_args(sys.argv[1:])
+    files = list(iter_files(args.files))
+    batches = [files[i:i + args.batch_size] for i in range(0, len(files), args.batch_size)]
+    output = open(args.output, 'w') if args.output else sys.stdout
+    lock = threading.Lock()
+    try:
+        with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+            failed = sum(pool.map(
+                lambda batch: export_batch(args.blender, batch, output, lock), batches))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    if failed:
+        print('%d files failed' % failed, file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
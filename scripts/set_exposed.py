@@ -0,0 +1,69 @@
+"""Set Node Expose values from the command line before rendering.
+
+Run inside Blender, e.g.:
+
+    blender --background shot.blend --python scripts/set_exposed.py -f 1 -- \
+        --material Rust --set "Top/Wear/Mix/INPUT/Fac=0.3" --set "Top/Tint/Mix/INPUT/Color1=1,0,0,1"
+
+Paths are the names of the frames down to the node, then the node name,
+INPUT or OUTPUT, and the socket identifier or name. Pass --list to print every
+exposed path of a tree. Render arguments given before -- (-f, -a) run after
+the values are set. Exits with code 1 if any value couldn't be set.
+"""
+import argparse
+import importlib
+import sys
+from pathlib import Path
+
+import bpy
+import addon_utils
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+ADDON = 'NodeExpose'
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    owner = parser.add_mutually_exclusive_group(required=True)
+    owner.add_argument('--material')
+    owner.add_argument('--node-group')
+    owner.add_argument('--scene', help="set values of the scene's compositor")
+    owner.add_argument('--texture')
+    parser.add_argument('--set', action='append', default=[], metavar='PATH=VALUE')
+    parser.add_argument('--list', action='store_true', help="print exposed paths and values")
+    parser.add_argument('--save', action='store_true', help="save the .blend file afterwards")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    addon_utils.enable(ADDON, default_set=True)
+    cli = importlib.import_module(ADDON + '.lib.cli')
+
+    owner_type = next(t for t in cli.OWNER_TYPES if getattr(args, t) is not None)
+    try:
+        tree = cli.get_tree(owner_type, getattr(args, owner_type))
+    except KeyError as err:
+        print('ERROR: %s' % err)
+        sys.exit(1)
+
+    if args.list:
+        for path, socket in sorted(cli.get_exposed_sockets(tree).items()):
+            value = socket.default_value
+            if hasattr(value, '__len__') and not isinstance(value, str):
+                value = ','.join('%g' % v for v in value)
+            print('%s=%s' % (path, value))
+
+    errors = cli.set_values(tree, args.set)
+    for error in errors:
+        print('ERROR: ' + error)
+    if errors:
+        sys.exit(1)
+    if args.save:
+        bpy.ops.wm.save_mainfile()
+
+
+main()
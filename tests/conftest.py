@@ -1,3 +1,4 @@
+from types import SimpleNamespace
 import pytest
 import bmesh
 import bpy
@@ -6,3 +7,36 @@ import bpy
 @pytest.fixture
 def bpy_module(cache):
     return cache.get("bpy_module", None)
+
+
+@pytest.fixture
+def exposed_material():
+    """Material with an exposed frame named "Top" and labelled "Wear".
+
+    The frame holds a Value node named "Value" and labelled "Roughness", a
+    Mix node named "Mix" and a Mix node named "Excluded" with exclude_node set.
+    """
+    mat = bpy.data.materials.new("NE_Test_Material")
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+    nodes.clear()
+
+    top = nodes.new('NodeFrame')
+    top.name = "Top"
+    top.label = "Wear"
+    top.ne_node_props.expose_frame = True
+    value = nodes.new('ShaderNodeValue')
+    value.name = "Value"
+    value.label = "Roughness"
+    value.parent = top
+    mix = nodes.new('ShaderNodeMixRGB')
+    mix.name = "Mix"
+    mix.parent = top
+    excluded = nodes.new('ShaderNodeMixRGB')
+    excluded.name = "Excluded"
+    excluded.parent = top
+    excluded.ne_node_props.exclude_node = True
+
+    yield SimpleNamespace(
+        mat=mat, tree=mat.node_tree, top=top, value=value, mix=mix, excluded=excluded)
+    bpy.data.materials.remove(mat)
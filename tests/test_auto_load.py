@@ -0,0 +1,41 @@
+import importlib
+import json
+import pytest
+
+
+def test_toposort_orders_dependencies(bpy_module):
+    auto_load = importlib.import_module(bpy_module + '.auto_load')
+    assert auto_load.toposort({'a': {'b'}, 'b': {'c'}, 'c': set()}) == ['c', 'b', 'a']
+
+
+def test_toposort_reports_cycles(bpy_module):
+    auto_load = importlib.import_module(bpy_module + '.auto_load')
+    with pytest.raises(auto_load.RegistrationCycleError):
+        auto_load.toposort({'a': {'b'}, 'b': {'a'}, 'c': set()})
+
+
+def test_manifest_matches_computed_order(bpy_module, tmp_path):
+    auto_load = importlib.import_module(bpy_module + '.auto_load')
+    directory = auto_load.Path(auto_load.__file__).parent
+    manifest_path = tmp_path / auto_load.MANIFEST_NAME
+    files = auto_load.get_source_files(directory)
+    modules = auto_load.get_all_submodules(directory)
+    classes = auto_load.get_ordered_classes_to_register(modules)
+    auto_load.save_manifest(manifest_path, directory, files, modules, classes)
+    assert auto_load.load_manifest(manifest_path, directory, files) == (modules, classes)
+
+
+def test_manifest_stores_new_mtimes(bpy_module, tmp_path):
+    auto_load = importlib.import_module(bpy_module + '.auto_load')
+    directory = auto_load.Path(auto_load.__file__).parent
+    manifest_path = tmp_path / auto_load.MANIFEST_NAME
+    files = auto_load.get_source_files(directory)
+    modules = auto_load.get_all_submodules(directory)
+    classes = auto_load.get_ordered_classes_to_register(modules)
+    auto_load.save_manifest(manifest_path, directory, files, modules, classes)
+
+    # same contents with a new mtime, as after a fresh checkout
+    touched = {name: (mtime + 1, size) for name, (mtime, size) in files.items()}
+    assert auto_load.load_manifest(manifest_path, directory, touched) == (modules, classes)
+    stored = json.loads(manifest_path.read_text())['files']
+    assert {name: tuple(entry[:2]) for name, entry in stored.items()} == touched
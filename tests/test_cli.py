@@ -0,0 +1,14 @@
+import importlib
+
+
+def test_set_values_by_path(bpy_module, exposed_material):
+    cli = importlib.import_module(bpy_module + '.lib.cli')
+    mix = exposed_material.mix
+
+    errors = cli.set_values(exposed_material.tree, [
+        "Top/Mix/INPUT/Fac=0.25",
+        "Top/Mix/INPUT/Color1=1,0,0,1",
+        "Top/Missing/INPUT/Fac=1"])
+    assert errors == ["No exposed socket Top/Missing/INPUT/Fac"]
+    assert mix.inputs['Fac'].default_value == 0.25
+    assert tuple(mix.inputs['Color1'].default_value) == (1, 0, 0, 1)
@@ -0,0 +1,48 @@
+import importlib
+import json
+import bpy
+
+
+def test_iter_records(bpy_module, exposed_material):
+    export = importlib.import_module(bpy_module + '.lib.export')
+    exposed_material.mix.inputs['Fac'].default_value = 0.25
+
+    records = [r for r in export.iter_records("test.blend")
+               if r['owner'] == exposed_material.mat.name]
+    assert {r['node'] for r in records} == {"Roughness", "Mix"}
+    fac = next(r for r in records if r['path'] == "Top/Mix/INPUT/Fac")
+    assert fac['owner_type'] == 'MATERIAL'
+    assert fac['top_level_frame'] == "Wear"
+    assert fac['value'] == 0.25
+    color = next(r for r in records if r['path'] == "Top/Mix/INPUT/Color1")
+    assert len(color['value']) == 4
+    for record in records:
+        json.dumps(record)
+
+
+def test_records_follow_group_nodes(bpy_module, exposed_material):
+    export = importlib.import_module(bpy_module + '.lib.export')
+    group = bpy.data.node_groups.new("NE_Test_Export_Group", 'ShaderNodeTree')
+    inner = group.nodes.new('NodeFrame')
+    inner.name = "Inner"
+    inner.ne_node_props.expose_frame = True
+    value = group.nodes.new('ShaderNodeValue')
+    value.name = "Value"
+    value.parent = inner
+    group_node = exposed_material.tree.nodes.new('ShaderNodeGroup')
+    group_node.name = "Group"
+    group_node.node_tree = group
+    group_node.parent = exposed_material.top
+
+    try:
+        paths = {r['path'] for r in export.iter_records("test.blend")
+                 if r['owner'] == exposed_material.mat.name}
+        assert "Top/Group/Inner/Value/OUTPUT/Value" in paths
+    finally:
+        bpy.data.node_groups.remove(group)
+
+
+def test_non_finite_values_are_null(bpy_module):
+    export = importlib.import_module(bpy_module + '.lib.export')
+    assert export.to_json_value(float('nan')) is None
+    assert export.to_json_value((1.0, float('inf'), 0.5)) == [1.0, None, 0.5]
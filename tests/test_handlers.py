@@ -0,0 +1,20 @@
+import importlib
+import bpy
+
+
+def on_update(scene, depsgraph):
+    pass
+
+
+def test_handlers_are_deduplicated_and_removed(bpy_module):
+    handlers = importlib.import_module(bpy_module + '.lib.handlers')
+    event = 'depsgraph_update_post'
+    before = len(bpy.app.handlers.depsgraph_update_post)
+
+    handlers.add_handler(event, on_update)
+    handlers.add_handler(event, on_update)
+    assert len(bpy.app.handlers.depsgraph_update_post) == before + 1
+    assert (event, __name__ + '.on_update', 0, 0.0) in handlers.report()
+
+    handlers.remove_module(__name__)
+    assert len(bpy.app.handlers.depsgraph_update_post) == before
@@ -0,0 +1,30 @@
+import importlib
+
+
+def test_reparented_node_rebuilds_hierarchy(bpy_module, exposed_material):
+    hierarchy = importlib.import_module(bpy_module + '.lib.hierarchy')
+    tree, top = exposed_material.tree, exposed_material.top
+    first = hierarchy.get_hierarchy(tree)
+    assert exposed_material.mix in first.child_nodes(top)
+    assert hierarchy.get_hierarchy(tree) is first
+
+    exposed_material.mix.parent = None
+    assert hierarchy.is_stale(tree)
+    second = hierarchy.get_hierarchy(tree)
+    assert second.version != first.version
+    assert [n.name for n in second.child_nodes(top)] == ["Value"]
+
+
+def test_delete_and_add_rebuilds_hierarchy(bpy_module, exposed_material):
+    hierarchy = importlib.import_module(bpy_module + '.lib.hierarchy')
+    tree, top = exposed_material.tree, exposed_material.top
+    first = hierarchy.get_hierarchy(tree)
+
+    # same node count and names as before
+    tree.nodes.remove(exposed_material.mix)
+    mix = tree.nodes.new('ShaderNodeMixRGB')
+    mix.name = "Mix"
+    mix.parent = top
+    second = hierarchy.get_hierarchy(tree)
+    assert second is not first
+    assert len(second.child_nodes(top)) == 2
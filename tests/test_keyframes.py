@@ -0,0 +1,21 @@
+import importlib
+
+
+def test_key_exposed(bpy_module, exposed_material):
+    keyframes = importlib.import_module(bpy_module + '.lib.keyframes')
+    tree, top = exposed_material.tree, exposed_material.top
+    value, mix = exposed_material.value, exposed_material.mix
+    value.outputs[0].default_value = 0.5
+
+    # value, mix factor and two colours of four channels
+    assert keyframes.key_exposed(tree, top.name, 10) == 10
+    # keying again at another frame adds to the same curves
+    assert keyframes.key_exposed(tree, top.name, 20) == 10
+    fcurves = tree.animation_data.action.fcurves
+    assert len(fcurves) == 10
+    fcurve = fcurves.find('nodes["%s"].outputs[0].default_value' % value.name)
+    assert [tuple(p.co) for p in fcurve.keyframe_points] == [(10, 0.5), (20, 0.5)]
+
+    # linked inputs aren't keyed
+    tree.links.new(value.outputs[0], mix.inputs['Fac'])
+    assert keyframes.key_exposed(tree, top.name, 30) == 9
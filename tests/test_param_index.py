@@ -0,0 +1,33 @@
+import importlib
+
+
+def test_index_rows_and_filter(bpy_module, exposed_material):
+    param_index = importlib.import_module(bpy_module + '.lib.param_index')
+
+    index = param_index.ParameterIndex()
+    assert index.refresh()
+    rows = [row for row in index.rows if row.owner == exposed_material.mat.name]
+    # the excluded node has no rows
+    assert {(row.frame, row.node) for row in rows} == {("Wear", "Roughness"), ("Wear", "Mix")}
+    # nothing changed so nothing is rebuilt
+    assert not index.refresh()
+
+    flags, _ = index.filter("rough", False, 1)
+    assert [row for row, flag in zip(index.rows, flags) if flag] == \
+        [row for row in rows if row.node == "Roughness"]
+
+
+def test_refresh_updated_ids(bpy_module, exposed_material):
+    param_index = importlib.import_module(bpy_module + '.lib.param_index')
+    mat = exposed_material.mat
+
+    index = param_index.ParameterIndex()
+    index.refresh()
+    exposed_material.mix.parent = None
+    # only the material is looked at again
+    index.mark_dirty([mat])
+    assert index.updated == {('materials', mat.name, mat.as_pointer())}
+    assert index.refresh()
+    rows = [row for row in index.rows if row.owner == mat.name]
+    assert [row.node for row in rows] == ["Roughness"]
+
@@ -0,0 +1,64 @@
+import importlib
+import zlib
+from array import array
+
+
+def make_snapshot(bpy_module, layout='abc'):
+    snapshot = importlib.import_module(bpy_module + '.lib.snapshot')
+    return {
+        'layout': layout,
+        'paths': zlib.compress(b'Frame/Value/OUTPUT/Value\t0\tf'),
+        'values': snapshot.encode_values({'f': array('f', [0.5]), 'i': array('i')}),
+        'node_props': '{}'}
+
+
+def test_preset_round_trip(bpy_module, tmp_path):
+    presets = importlib.import_module(bpy_module + '.lib.presets')
+    filepath = str(tmp_path / ('A' + presets.EXTENSION))
+    snapshot = make_snapshot(bpy_module)
+    presets.write_preset(filepath, 'A', snapshot)
+
+    header = presets.read_header(filepath)
+    assert header['name'] == 'A'
+    with presets.open_preset(filepath, header) as stored:
+        assert stored['layout'] == snapshot['layout']
+        for section in ('paths', 'values'):
+            assert isinstance(stored[section], memoryview)
+            assert zlib.decompress(stored[section]) == zlib.decompress(snapshot[section])
+        assert str(stored['node_props'], 'utf-8') == snapshot['node_props']
+
+
+def test_index_picks_up_overwritten_preset(bpy_module, tmp_path):
+    presets = importlib.import_module(bpy_module + '.lib.presets')
+    filepath = str(tmp_path / ('A' + presets.EXTENSION))
+    presets.write_preset(filepath, 'A', make_snapshot(bpy_module))
+    index = presets.PresetIndex(str(tmp_path))
+    index.refresh()
+
+    presets.write_preset(filepath, 'A', make_snapshot(bpy_module, 'xyz-longer-key'))
+    assert index.refresh()
+    assert [name for _, name in index.presets_for('xyz-longer-key')] == ['A']
+
+
+def test_index_lists_presets_by_layout(bpy_module, tmp_path):
+    presets = importlib.import_module(bpy_module + '.lib.presets')
+    presets.write_preset(str(tmp_path / ('B' + presets.EXTENSION)), 'B', make_snapshot(bpy_module))
+    presets.write_preset(str(tmp_path / ('A' + presets.EXTENSION)), 'A', make_snapshot(bpy_module))
+    presets.write_preset(str(tmp_path / ('C' + presets.EXTENSION)), 'C', make_snapshot(bpy_module, 'xyz'))
+
+    index = presets.PresetIndex(str(tmp_path))
+    index.refresh()
+    assert [name for _, name in index.presets_for('abc')] == ['A', 'B']
+
+    # a new index picks headers up from the index file
+    assert presets.PresetIndex(str(tmp_path)).entries.keys() == index.entries.keys()
+
+
+def test_lookup_does_not_rescan(bpy_module, tmp_path):
+    presets = importlib.import_module(bpy_module + '.lib.presets')
+    index = presets.get_preset_index(str(tmp_path))
+    presets.write_preset(str(tmp_path / ('A' + presets.EXTENSION)), 'A', make_snapshot(bpy_module))
+
+    assert presets.get_preset_index(str(tmp_path)).presets_for('abc') == []
+    index.refresh()
+    assert [name for _, name in index.presets_for('abc')] == ['A']
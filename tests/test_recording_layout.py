@@ -0,0 +1,43 @@
+import importlib
+import pytest
+import bpy
+
+
+@pytest.fixture
+def nested_material(exposed_material):
+    nodes = exposed_material.tree.nodes
+    sub = nodes.new('NodeFrame')
+    sub.label = "Sub"
+    sub.parent = exposed_material.top
+    ramp = nodes.new('ShaderNodeValToRGB')
+    ramp.label = "Ramp"
+    ramp.parent = sub
+    return exposed_material
+
+
+def record_frame(bpy_module, mat, top):
+    panels = importlib.import_module(bpy_module + '.panels')
+    recording_layout = importlib.import_module(
+        bpy_module + '.lib.recording_layout')
+    recorder = recording_layout.Recorder()
+    nodes = mat.node_tree.nodes
+    with recorder.patch(panels):
+        panels.display_frame(recording_layout.RecordingPanel(recorder),
+                             bpy.context, nodes, top, top.name)
+    return recorder
+
+
+def test_display_frame_records_widgets(bpy_module, nested_material):
+    recorder = record_frame(bpy_module, nested_material.mat, nested_material.top)
+
+    # value node prop, subpanel toggles for the mix node, the sub frame and the ramp
+    assert recorder.counts['prop'] == 4
+    assert recorder.counts['draw_buttons'] == 2
+    assert set(recorder.node_timings) == {
+        'ShaderNodeValue', 'ShaderNodeMixRGB', 'ShaderNodeValToRGB'}
+
+
+def test_identical_redraws_have_no_diff(bpy_module, nested_material):
+    first = record_frame(bpy_module, nested_material.mat, nested_material.top)
+    second = record_frame(bpy_module, nested_material.mat, nested_material.top)
+    assert not second.diff(first)
@@ -0,0 +1,49 @@
+import importlib
+from array import array
+import pytest
+import bpy
+
+
+def test_restore_snapshot(bpy_module, exposed_material):
+    snapshot = importlib.import_module(bpy_module + '.lib.snapshot')
+    mat, top = exposed_material.mat, exposed_material.top
+    value, mix = exposed_material.value, exposed_material.mix
+    value.outputs[0].default_value = 0.25
+    mix.inputs['Color1'].default_value = (1, 0, 0, 1)
+    mix.blend_type = 'MULTIPLY'
+    snapshot.store_snapshot(mat, 'A', snapshot.capture(mat.node_tree, top.name))
+
+    value.outputs[0].default_value = 0.75
+    mix.inputs['Color1'].default_value = (0, 1, 0, 1)
+    mix.blend_type = 'ADD'
+    written = snapshot.restore(mat.node_tree, top.name, snapshot.get_snapshots(mat)['A'])
+
+    assert written == 2
+    assert value.outputs[0].default_value == pytest.approx(0.25)
+    assert tuple(mix.inputs['Color1'].default_value) == pytest.approx((1, 0, 0, 1))
+    assert mix.blend_type == 'MULTIPLY'
+
+
+def test_restore_keeps_int_precision(bpy_module):
+    snapshot = importlib.import_module(bpy_module + '.lib.snapshot')
+    tree = bpy.data.node_groups.new("NE_Test_Snapshot_Int", 'GeometryNodeTree')
+    top = tree.nodes.new('NodeFrame')
+    top.ne_node_props.expose_frame = True
+    grid = tree.nodes.new('GeometryNodeMeshGrid')
+    grid.parent = top
+    try:
+        grid.inputs['Vertices X'].default_value = 2 ** 24 + 1
+        blob = snapshot.capture(tree, top.name)
+        grid.inputs['Vertices X'].default_value = 3
+        assert snapshot.restore(tree, top.name, blob) == 1
+        assert grid.inputs['Vertices X'].default_value == 2 ** 24 + 1
+    finally:
+        bpy.data.node_groups.remove(tree)
+
+
+def test_encode_round_trip_keeps_ints(bpy_module):
+    snapshot = importlib.import_module(bpy_module + '.lib.snapshot')
+    values = snapshot.decode_values(snapshot.encode_values(
+        {'f': array('f', [0.5, 2]), 'i': array('i', [2 ** 30 + 1])}))
+    assert list(values['f']) == [0.5, 2]
+    assert list(values['i']) == [2 ** 30 + 1]